@@ -0,0 +1,77 @@
+"""Spawn latency against parent RSS.
+
+Compares three ways of running ``/bin/true`` from a parent whose resident
+set is grown step by step with a touched ballast buffer:
+
+* ``fork``        -- subprocess with a ``preexec_fn``, which forces fork+exec
+* ``subprocess``  -- subprocess.run defaults (vfork on CPython 3.10+)
+* ``posix_spawn`` -- linux_overview.spawn.run
+
+Usage::
+
+    python benchmarks/bench_spawn.py --sizes 0,512,2048 --runs 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linux_overview import spawn  # noqa: E402
+
+PAGE = os.sysconf('SC_PAGE_SIZE')
+ARGS = ['/bin/true']
+
+
+def rss_mib() -> float:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * PAGE / 2**20
+
+
+def ballast(mib: int) -> bytearray:
+    buf = bytearray(mib * 2**20)
+    # Touch every page so it is really resident.
+    buf[::PAGE] = b'\1' * len(range(0, len(buf), PAGE))
+    return buf
+
+
+def timed(fn, runs: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+METHODS = {
+    'fork': lambda: subprocess.run(ARGS, preexec_fn=lambda: None),
+    'subprocess': lambda: subprocess.run(ARGS),
+    'posix_spawn': lambda: spawn.run(ARGS),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='0,256,1024',
+                        help='comma-separated ballast sizes in MiB')
+    parser.add_argument('--runs', type=int, default=200)
+    opts = parser.parse_args()
+
+    print('%10s' % 'rss MiB' + ''.join('%14s' % m for m in METHODS) +
+          '   (us per spawn)')
+    held = []
+    for size in (int(s) for s in opts.sizes.split(',')):
+        held.append(ballast(size - sum(len(b) for b in held) // 2**20))
+        row = '%10.0f' % rss_mib()
+        for fn in METHODS.values():
+            row += '%14.1f' % timed(fn, opts.runs)
+        print(row, flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+"""Native replacements for the shell-outs used in the main.py walkthrough.
+
+Every module here answers one of the cells in main.py (``find``, ``wc``,
+``awk``, ``top``, ``uname``/``df``/``free``/``lscpu``, ...) by reading the
+kernel interfaces directly instead of forking a helper binary.  Only the
+standard library is used, so everything keeps working on minimal containers.
+"""
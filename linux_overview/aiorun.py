@@ -0,0 +1,162 @@
+"""Run many independent commands concurrently with asyncio.
+
+The user-info cells (``whoami``, ``id``, ``ls -l $HOME``) and the system-info
+cells (``uname``, ``df``, ``free``, ``lscpu``) each wait for the previous one
+to finish.  :func:`run_many` starts them together, at most ``limit`` at a
+time, so a batch takes about as long as its slowest command::
+
+    from linux_overview.aiorun import run_many
+
+    results = run_many([['uname', '-a'], ['df', '-h'], ['free', '-h'],
+                        ['lscpu']], timeout=5)
+    {r.args[0]: r.stdout for r in results if r.ok}
+
+A command that cannot be started (``ss`` missing on a minimal container) or
+that runs past its timeout produces a result with ``error`` set instead of
+raising and taking the rest of the batch down with it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Union
+
+from .cancel import killpg
+
+Output = Union[str, bytes, None]
+
+# After a timeout kill, how long to wait for the pipes to close.  Only a
+# descendant that left the process group can keep them open that long.
+DRAIN_TIMEOUT = 1.0
+
+
+class CommandResult(NamedTuple):
+    args: Sequence[str]
+    returncode: Optional[int]
+    stdout: Output
+    stderr: Output
+    elapsed: float
+    timed_out: bool = False
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and self.error is None
+
+
+def _kill(proc, group: bool) -> None:
+    if group:
+        killpg(proc.pid)
+    elif proc.returncode is None:
+        proc.kill()
+
+
+async def _open_pipe():
+    """``(reader, transport, write fd)`` for a pipe read by this loop.
+
+    The pipes are ours rather than the subprocess transport's, so they can
+    be closed while a descendant that escaped the kill still holds them.
+    """
+    r, w = os.pipe()
+    reader = asyncio.StreamReader()
+    try:
+        transport, _ = await asyncio.get_running_loop().connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(r, 'rb', 0))
+    except BaseException:
+        os.close(w)
+        raise
+    return reader, transport, w
+
+
+async def _read(reader: asyncio.StreamReader, chunks: List[bytes]) -> None:
+    while True:
+        data = await reader.read(1 << 16)
+        if not data:
+            return
+        chunks.append(data)
+
+
+async def run_command(args: Sequence[str], timeout: Optional[float] = None,
+                      text: bool = True, **kwargs) -> CommandResult:
+    """Run one command with ``asyncio.create_subprocess_exec``.
+
+    Extra keyword arguments (``cwd``, ``env``, ...) are passed through.
+    The command runs in its own session, so on timeout its whole process
+    group is killed, including background children holding its pipes.
+    A timed-out result keeps the output read until then.
+    """
+    started = time.monotonic()
+    kwargs.setdefault('start_new_session', True)
+    pipes = []
+    try:
+        for _ in range(2):
+            pipes.append(await _open_pipe())
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *args, stdin=asyncio.subprocess.DEVNULL, stdout=pipes[0][2],
+                stderr=pipes[1][2], **kwargs)
+        finally:
+            for _, _, w in pipes:
+                os.close(w)
+    except OSError as e:
+        for _, transport, _ in pipes:
+            transport.close()
+        return CommandResult(args, None, None, None,
+                             time.monotonic() - started, error=str(e))
+    out_chunks: List[bytes] = []
+    err_chunks: List[bytes] = []
+    readers = [asyncio.ensure_future(_read(pipes[0][0], out_chunks)),
+               asyncio.ensure_future(_read(pipes[1][0], err_chunks))]
+    exited = asyncio.ensure_future(proc.wait())
+    timed_out = False
+    try:
+        _, pending = await asyncio.wait(readers + [exited], timeout=timeout)
+        if pending:
+            timed_out = True
+            _kill(proc, kwargs['start_new_session'])
+            # Only a descendant outside the group keeps the pipes open
+            # past this; what was read so far is kept either way.
+            await asyncio.wait(readers, timeout=DRAIN_TIMEOUT)
+        await exited
+    except asyncio.CancelledError:
+        _kill(proc, kwargs['start_new_session'])
+        await proc.wait()
+        raise
+    finally:
+        for task in readers:
+            task.cancel()
+        for _, transport, _ in pipes:
+            transport.close()
+    out, err = b''.join(out_chunks), b''.join(err_chunks)
+    if text:
+        out = out.decode(errors='replace')
+        err = err.decode(errors='replace')
+    return CommandResult(args, proc.returncode, out, err,
+                         time.monotonic() - started, timed_out,
+                         'timed out after %ss' % timeout if timed_out else None)
+
+
+async def gather_commands(commands: Iterable[Sequence[str]], limit: int = 8,
+                          timeout: Optional[float] = None, text: bool = True,
+                          **kwargs) -> List[CommandResult]:
+    """Run ``commands`` with at most ``limit`` alive at once.
+
+    Results come back in the order of ``commands``; ``timeout`` applies to
+    each command separately.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(args):
+        async with semaphore:
+            return await run_command(args, timeout, text, **kwargs)
+
+    return list(await asyncio.gather(*(bounded(list(a)) for a in commands)))
+
+
+def run_many(commands: Iterable[Sequence[str]], limit: int = 8,
+             timeout: Optional[float] = None, text: bool = True,
+             **kwargs) -> List[CommandResult]:
+    """Blocking wrapper around :func:`gather_commands`."""
+    return asyncio.run(gather_commands(commands, limit, timeout, text, **kwargs))
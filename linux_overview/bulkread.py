@@ -0,0 +1,112 @@
+"""Read many files at once, reporting failures per file.
+
+The "show contents of files" cells open the kernel-*.json files, README and a
+handful of /etc files one by one, and one of them died halfway with
+FileNotFoundError on a hard-coded kernel file name.  :func:`read_files`
+reads a list of paths or a glob on a thread pool and returns one
+:class:`FileResult` per path, so a missing or unreadable file
+(``/etc/security/opasswd``) is an entry with ``error`` set rather than an
+exception that loses the rest of the batch::
+
+    from linux_overview.bulkread import read_files
+
+    for r in read_files(['/etc/machine-id', '/etc/ld.so.conf',
+                         '/etc/security/opasswd'], encoding='utf-8'):
+        print(r.path, r.data if r.ok else r.error)
+
+    read_files('/home/sandbox/kernel-*.json')
+
+Each worker thread reads through one reusable buffer of
+:data:`SMALL_FILE_SIZE` bytes; a file that fits is copied out of it once,
+and only larger files fall back to growing reads.
+"""
+
+from __future__ import annotations
+
+import glob
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, NamedTuple, Optional, Union
+
+SMALL_FILE_SIZE = 64 * 1024
+
+DEFAULT_WORKERS = 8
+
+
+class FileResult(NamedTuple):
+    path: str
+    data: Union[bytes, str, None]
+    error: Optional[str] = None
+    errno: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+_local = threading.local()
+
+
+def _buffer() -> memoryview:
+    view = getattr(_local, 'view', None)
+    if view is None:
+        view = _local.view = memoryview(bytearray(SMALL_FILE_SIZE))
+    return view
+
+
+def _read_one(path: str, encoding: Optional[str],
+              max_size: Optional[int]) -> FileResult:
+    view = _buffer()
+    limit = len(view) if max_size is None else min(len(view), max_size)
+    try:
+        with open(path, 'rb', buffering=0) as f:
+            filled = 0
+            while filled < limit:
+                n = f.readinto(view[filled:limit])
+                if not n:
+                    break
+                filled += n
+            data = bytes(view[:filled])
+            if filled == len(view) and (max_size is None or max_size > filled):
+                # Did not fit in the shared buffer: read the remainder.
+                rest = f.read() if max_size is None else f.read(max_size - filled)
+                data += rest
+    except OSError as e:
+        return FileResult(path, None, e.strerror or str(e), e.errno)
+    if encoding is not None:
+        return FileResult(path, data.decode(encoding, 'replace'))
+    return FileResult(path, data)
+
+
+def _expand(paths: Union[str, os.PathLike, Iterable]) -> List[str]:
+    if isinstance(paths, (str, os.PathLike)):
+        pattern = os.fspath(paths)
+        if glob.has_magic(pattern):
+            return sorted(glob.glob(pattern))
+        return [pattern]
+    return [os.fspath(p) for p in paths]
+
+
+def read_files(paths: Union[str, os.PathLike, Iterable],
+               encoding: Optional[str] = None, workers: int = DEFAULT_WORKERS,
+               max_size: Optional[int] = None,
+               skip_errors: bool = False) -> List[FileResult]:
+    """Read every path concurrently; results keep the input order.
+
+    ``paths`` is an iterable of paths or a single path / glob pattern.
+    ``encoding`` decodes the contents (undecodable bytes are replaced),
+    ``max_size`` caps how much of each file is read and ``skip_errors``
+    drops failed entries instead of reporting them.
+    """
+    paths = _expand(paths)
+    if len(paths) <= 1 or workers <= 1:
+        results = [_read_one(p, encoding, max_size) for p in paths]
+    else:
+        with ThreadPoolExecutor(min(workers, len(paths))) as pool:
+            results = list(pool.map(_read_one, paths,
+                                    [encoding] * len(paths),
+                                    [max_size] * len(paths)))
+    if skip_errors:
+        results = [r for r in results if r.ok]
+    return results
@@ -0,0 +1,193 @@
+"""Opt-in memoization of command output.
+
+The walkthrough re-runs identical commands (``ls -l`` of the home directory,
+``ls /usr/bin``, ``find /etc``) and pays fork+exec every time.
+:class:`CommandCache` wraps ``subprocess.run`` / ``check_output`` and serves
+repeats from memory.  Entries are keyed by argv, working directory, stdin
+input, the other ``subprocess.run`` options and a chosen subset of the
+environment; they expire after a TTL, are
+evicted least-recently-used first and can be tied to paths whose mtime
+invalidates them::
+
+    from linux_overview.cache import CommandCache
+
+    cache = CommandCache(ttl=30)
+    cache.check_output(['ls', '/usr/bin'], text=True, watch=['/usr/bin'])
+    cache.check_output(['ls', '/usr/bin'], text=True, watch=['/usr/bin'])  # hit
+    cache.stats
+"""
+
+from __future__ import annotations
+
+import collections
+import os
+import subprocess
+import threading
+import time
+from typing import Iterable, NamedTuple, Optional, Sequence, Tuple
+
+DEFAULT_ENV_KEYS = ('PATH', 'HOME', 'USER', 'LANG', 'LC_ALL', 'LC_CTYPE', 'TZ')
+
+_DEFAULT_TTL = object()
+
+# run() keywords that don't change what a call produces.
+_UNKEYED = frozenset(['timeout', 'check'])
+# Standard stream values that can be replayed from a cached result.
+_STREAMS = (None, subprocess.PIPE, subprocess.STDOUT, subprocess.DEVNULL)
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+
+
+class _Entry(NamedTuple):
+    result: subprocess.CompletedProcess
+    expires: float
+    watched: Tuple[Tuple[str, Optional[int]], ...]
+
+
+def _mtimes(paths: Iterable[str]) -> Tuple[Tuple[str, Optional[int]], ...]:
+    stamps = []
+    for path in paths:
+        try:
+            stamps.append((path, os.stat(path).st_mtime_ns))
+        except OSError:
+            stamps.append((path, None))
+    return tuple(stamps)
+
+
+def _argv(args) -> object:
+    # A single string (``shell=True`` or a bare program) stays whole.
+    if isinstance(args, (str, bytes, os.PathLike)):
+        return os.fspath(args)
+    return tuple(os.fspath(a) for a in args)
+
+
+class CommandCache:
+    """LRU + TTL cache of ``CompletedProcess`` results."""
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = 60.0,
+                 env_keys: Sequence[str] = DEFAULT_ENV_KEYS,
+                 cache_failures: bool = False):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.env_keys = tuple(env_keys)
+        self.cache_failures = cache_failures
+        self._entries: 'collections.OrderedDict[tuple, _Entry]' = \
+            collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = self._invalidations = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions,
+                              self._invalidations, len(self._entries))
+
+    def key(self, args: Sequence[str], cwd=None, env=None, input=None,
+            text: bool = False, **kwargs) -> Optional[tuple]:
+        """The cache key a call with these arguments would use.
+
+        Every other ``subprocess.run`` keyword (``encoding``, ``shell``,
+        ``stderr``, ...) is part of the key.  ``None`` means the call can't
+        be cached: a stream goes to a file, or a value isn't hashable.
+        """
+        if any(kwargs.get(name) not in _STREAMS
+               for name in ('stdin', 'stdout', 'stderr')):
+            return None
+        env = os.environ if env is None else env
+        key = (_argv(args), os.path.abspath(os.fspath(cwd or os.getcwd())),
+               tuple((k, env.get(k)) for k in self.env_keys), input, bool(text),
+               tuple(sorted((k, v) for k, v in kwargs.items()
+                            if k not in _UNKEYED)))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _lookup(self, key: tuple) -> Optional[subprocess.CompletedProcess]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires < time.monotonic() or (
+                        entry.watched and _mtimes(p for p, _ in entry.watched)
+                        != entry.watched):
+                    del self._entries[key]
+                    self._invalidations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry.result
+            self._misses += 1
+            return None
+
+    def _store(self, key: tuple, result: subprocess.CompletedProcess,
+               ttl: Optional[float], watched) -> None:
+        expires = float('inf') if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = _Entry(result, expires, watched)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def run(self, args: Sequence[str], *, cwd=None, env=None, input=None,
+            text: bool = False, ttl=_DEFAULT_TTL,
+            watch: Iterable[str] = (), **kwargs) -> subprocess.CompletedProcess:
+        """``subprocess.run(args, capture_output=True, ...)`` with caching.
+
+        ``ttl`` overrides the cache default for this entry (``None`` never
+        expires).  ``watch`` lists paths whose mtime is recorded with the
+        entry; a change to any of them invalidates it.  Results with a
+        non-zero exit status are only cached when ``cache_failures`` is set.
+
+        Output is captured unless ``stdout`` or ``stderr`` is given; then
+        stdout defaults to a pipe and stderr is as requested.  Calls that
+        send a stream to a file are run uncached (see :meth:`key`).
+        """
+        check = kwargs.pop('check', False)
+        if 'stdout' in kwargs or 'stderr' in kwargs:
+            kwargs.setdefault('stdout', subprocess.PIPE)
+        else:
+            kwargs['capture_output'] = True
+        key = self.key(args, cwd, env, input, text, **kwargs)
+        result = None if key is None else self._lookup(key)
+        if result is None:
+            # Take the stamps before running so a change during the run is
+            # seen.
+            watched = _mtimes(os.fspath(p) for p in watch)
+            result = subprocess.run(args, cwd=cwd, env=env, input=input,
+                                    text=text, **kwargs)
+            if key is not None and (result.returncode == 0 or self.cache_failures):
+                if ttl is _DEFAULT_TTL:
+                    ttl = self.ttl
+                self._store(key, result, ttl, watched)
+        if check:
+            result.check_returncode()
+        return result
+
+    def check_output(self, args: Sequence[str], **kwargs):
+        """Cached ``subprocess.check_output``: stdout is captured, stderr
+        goes where the caller says (inherited by default, and not replayed
+        on a hit)."""
+        if 'stdout' in kwargs:
+            raise ValueError('stdout argument not allowed, it will be overridden.')
+        return self.run(args, stdout=subprocess.PIPE, check=True, **kwargs).stdout
+
+    def invalidate(self, args: Optional[Sequence[str]] = None) -> int:
+        """Drop entries for ``args`` (any cwd/env), or everything."""
+        with self._lock:
+            if args is None:
+                keys = list(self._entries)
+            else:
+                argv = _argv(args)
+                keys = [k for k in self._entries if k[0] == argv]
+            for k in keys:
+                del self._entries[k]
+            self._invalidations += len(keys)
+            return len(keys)
@@ -0,0 +1,144 @@
+"""Cooperative cancellation tokens with optional deadlines.
+
+The ``find / -name Dockerfile`` cell could only be stopped with a
+KeyboardInterrupt, which threw away everything found so far.  A
+:class:`CancelToken` is handed to long-running scans and commands
+(:func:`linux_overview.walk.scan_files`, :func:`linux_overview.stream.run_lines`);
+they check it between units of work, kill their child process group when it
+fires and return what they have, marked as truncated::
+
+    from linux_overview.cancel import CancelToken
+    from linux_overview.walk import scan_files
+
+    token = CancelToken(timeout=5.0)      # or token.cancel() from elsewhere
+    result = scan_files('/', include='Dockerfile', cancel=token)
+    result.paths, result.truncated, token.reason
+
+A token fires once, either explicitly or when its deadline passes; the
+deadline is only watched by a timer thread once a callback is registered.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class Cancelled(Exception):
+    """Raised by :meth:`CancelToken.raise_if_cancelled`."""
+
+
+class CancelToken:
+    """Thread-safe "stop now" flag, optionally tied to a deadline."""
+
+    def __init__(self, timeout: Optional[float] = None,
+                 parent: Optional['CancelToken'] = None):
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        if parent is not None and parent.deadline is not None and (
+                self.deadline is None or parent.deadline < self.deadline):
+            self.deadline = parent.deadline
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self._timer: Optional[threading.Timer] = None
+        self._detach: Callable[[], None] = lambda: None
+        if parent is not None:
+            self._detach = parent.on_cancel(
+                lambda: self.cancel(parent.reason or 'cancelled'))
+
+    def cancel(self, reason: str = 'cancelled') -> None:
+        """Fire the token; callbacks run once, in the calling thread."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        for callback in callbacks:
+            callback()
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._event.is_set() and self.deadline is not None \
+                and time.monotonic() >= self.deadline:
+            self.cancel('timeout')
+        return self._event.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the deadline (``None`` without one)."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the token fires or ``timeout`` passes."""
+        remaining = self.remaining()
+        if remaining is not None and (timeout is None or remaining < timeout):
+            timeout = remaining
+        self._event.wait(timeout)
+        return self.cancelled
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise Cancelled(self.reason)
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run ``callback`` when the token fires (now, if it already has).
+
+        Returns a function that unregisters it.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                if self.deadline is not None and self._timer is None:
+                    self._timer = threading.Timer(self.remaining(), self.cancel,
+                                                  args=('timeout',))
+                    self._timer.daemon = True
+                    self._timer.start()
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def close(self) -> None:
+        """Unregister from the parent token and stop the deadline timer.
+
+        For tokens made for one operation: without this, a long-lived
+        parent keeps every child it ever had.  The token can still be
+        checked, and fires on its own deadline, afterwards.
+        """
+        self._detach()
+        self._detach = lambda: None
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+
+    def _discard(self, callback) -> None:
+        with self._lock:
+            try:
+                self._callbacks.remove(callback)
+            except ValueError:
+                pass
+            timer = None
+            if not self._callbacks:
+                # Nothing left to run on the deadline; a later on_cancel
+                # starts a new timer.
+                timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+
+
+def killpg(pid: int, sig: int = signal.SIGKILL) -> None:
+    """Signal the process group led by ``pid`` (started with
+    ``start_new_session=True``), ignoring one that is already gone."""
+    try:
+        os.killpg(pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
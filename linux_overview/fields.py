@@ -0,0 +1,168 @@
+"""awk ``-F`` style field extraction without a shell.
+
+The date-splitting example builds ``echo "..." | awk -F"-" '{print $1, $2,
+$3}'`` with an f-string, which broke on the braces and then on a lost
+variable, and forks a shell for a single split.  This module applies awk's
+field rules in-process::
+
+    from linux_overview.fields import awk_print, columns, split_fields
+
+    split_fields('09-08-2023', '-')                 # ['09', '08', '2023']
+    awk_print(['09-08-2023'], (1, 2, 3), sep='-')   # ['09 08 2023']
+
+    for day, month, year in columns(open('dates.txt'), (1, 2, 3), sep='-'):
+        ...
+
+Separator rules follow awk: ``' '`` (the default) splits on runs of spaces and
+tabs and ignores leading and trailing ones (``\\r``, ``\\v`` and other Unicode
+whitespace stay inside fields), any other single character splits on that
+literal character, and longer separators are regular expressions.  Field 0 is
+the whole line and fields past the end of a line are empty strings.
+
+:func:`column_batches` works a batch of lines at a time.  With a
+single-character separator the batch is joined into one string: when every
+line has the same number of fields, one ``str.split`` and strided slices
+produce the columns, otherwise all selected fields of all lines come out of
+a single ``re.findall`` call.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+Lines = Union[str, Iterable[str]]
+
+DEFAULT_BATCH = 65536
+
+# awk's default FS splits on blanks only, not on every str.isspace()
+# character (\r, \v, \f, U+00A0, ...).
+_BLANKS = re.compile(r'[ \t]+')
+
+
+def _separator(sep: str) -> Optional[re.Pattern]:
+    """Compiled regex for multi-character separators, else ``None``."""
+    if sep == ' ' or len(sep) == 1:
+        return None
+    return re.compile(sep)
+
+
+def split_fields(line: str, sep: str = ' ') -> List[str]:
+    """Split one line into fields ($1..$NF) the way awk does."""
+    line = line.rstrip('\n')
+    if sep == ' ':
+        line = line.strip(' \t')
+        return _BLANKS.split(line) if line else []
+    if not line:
+        return []
+    if len(sep) == 1:
+        return line.split(sep)
+    return re.split(sep, line)
+
+
+def _batch_regex(sep: str, count: int, whole: bool) -> re.Pattern:
+    # One capture group per field 1..count, each optional so that short
+    # lines yield '' for missing fields; the rest of the line is consumed.
+    if sep == ' ':
+        lead, field, gap = r'[ \t]*', r'([^ \t\n]*)', r'[ \t]+'
+    else:
+        s = re.escape(sep)
+        lead, field, gap = '', r'([^%s\n]*)' % s, s
+    parts = [r'^', r'(?=([^\n]*))' if whole else '', lead, field]
+    parts.extend('(?:%s%s)?' % (gap, field) for _ in range(count - 1))
+    parts.append(r'[^\n]*')
+    return re.compile(''.join(parts), re.M)
+
+
+def _uniform_split(batch: List[str], sep: str) -> Optional[List[List[str]]]:
+    """Columns of a batch whose lines all have the same number of fields.
+
+    The whole batch is split with one ``str.split`` call and the columns
+    are strided slices of the result, so no per-line lists are built.
+    """
+    counts = set(map(str.count, batch, [sep] * len(batch)))
+    if len(counts) != 1:
+        return None
+    nf = counts.pop() + 1
+    flat = sep.join(batch).split(sep)
+    return [flat[i::nf] for i in range(nf)]
+
+
+def _iter_batches(lines: Lines, size: int) -> Iterator[List[str]]:
+    if isinstance(lines, str):
+        # awk records end at '\n' only, unlike str.splitlines().
+        lines = lines.split('\n')
+        if not lines[-1]:
+            lines.pop()
+    batch = []
+    for line in lines:
+        batch.append(line.rstrip('\n'))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def columns(lines: Lines, fields: Sequence[int] = (0,), sep: str = ' ',
+            pattern: Optional[str] = None,
+            batch_size: int = DEFAULT_BATCH) -> Iterator[Tuple[str, ...]]:
+    """Yield one tuple of the selected ``fields`` per input line.
+
+    ``lines`` is a string or any iterable of lines (an open file works).
+    ``pattern`` keeps only lines where the regex matches, like awk's
+    ``/re/ { print ... }``.
+    """
+    for batch in column_batches(lines, fields, sep, pattern, batch_size):
+        yield from zip(*batch)
+
+
+def column_batches(lines: Lines, fields: Sequence[int] = (0,), sep: str = ' ',
+                   pattern: Optional[str] = None,
+                   batch_size: int = DEFAULT_BATCH) -> Iterator[List[List[str]]]:
+    """Yield lists of columns, one list per field, ``batch_size`` rows at a time.
+
+    This is the columnar form of :func:`columns`: each batch is
+    ``[[$f1 of every line], [$f2 of every line], ...]``.
+    """
+    fields = list(fields)
+    if not fields or min(fields) < 0:
+        raise ValueError('fields must be non-negative field numbers')
+    wanted = re.compile(pattern).search if pattern is not None else None
+    regex_sep = _separator(sep)
+    count = max(max(fields), 1)
+    whole = 0 in fields
+    batch_re = None if regex_sep is not None else _batch_regex(sep, count, whole)
+    # Position of each requested field inside the findall() tuples.
+    offset = 0 if whole else 1
+    for batch in _iter_batches(lines, batch_size):
+        if wanted is not None:
+            batch = [line for line in batch if wanted(line)]
+            if not batch:
+                continue
+        if sep != ' ' and regex_sep is None:
+            cols = _uniform_split(batch, sep)
+            if cols is not None:
+                n = len(batch)
+                yield [batch if f == 0 else
+                       (cols[f - 1] if f <= len(cols) else [''] * n)
+                       for f in fields]
+                continue
+        if batch_re is not None:
+            rows = batch_re.findall('\n'.join(batch))
+            if count + whole == 1:
+                cols = [rows]
+            else:
+                cols = [list(c) for c in zip(*rows)]
+            yield [cols[f - offset] if f else cols[0] for f in fields]
+        else:
+            split = [regex_sep.split(line) if line else [] for line in batch]
+            yield [[line if f == 0 else (parts[f - 1] if f <= len(parts) else '')
+                    for line, parts in zip(batch, split)]
+                   for f in fields]
+
+
+def awk_print(lines: Lines, fields: Sequence[int], sep: str = ' ',
+              ofs: str = ' ', pattern: Optional[str] = None) -> List[str]:
+    """``awk -F sep '{print $a, $b, ...}'``: selected fields joined by ``ofs``."""
+    return [ofs.join(row) for row in columns(lines, fields, sep, pattern)]
@@ -0,0 +1,187 @@
+"""Parallel content search over walker results, without forking grep.
+
+Finding files that contain a string meant piping data into ``grep`` with
+``communicate()``, or forking grep per file.  :func:`grep` takes any stream
+of paths (typically :func:`linux_overview.walk.walk_files`), ``mmap`` s each
+file and runs one compiled bytes regex over it on a pool of worker
+processes; matches stream back as they are found::
+
+    from linux_overview.grep import grep, grep_tree
+
+    for path, line_no, line in grep_tree('/etc', rb'PermitRootLogin'):
+        print(path, line_no, line)
+
+    grep(walk_files('/home', include='*.env'), rb'(?i)secret', text=True)
+
+Binary files are skipped like grep does by default: a NUL byte in the first
+8 KiB marks the file as binary.  Lines are returned without their newline.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .walk import Patterns, walk_files
+
+SNIFF_SIZE = 8192
+BATCH_SIZE = 64
+
+Pattern = Union[bytes, str, 're.Pattern[bytes]']
+
+
+class Match(NamedTuple):
+    path: str
+    line_no: int
+    line: Union[bytes, str]
+
+
+# The compiled pattern of a worker process, set once by _init_worker.
+_regex: Optional['re.Pattern[bytes]'] = None
+
+
+def is_binary(data) -> bool:
+    """grep's heuristic: a NUL byte in the first :data:`SNIFF_SIZE` bytes."""
+    return b'\0' in data[:SNIFF_SIZE]
+
+
+def _compile(pattern: Pattern, ignore_case: bool) -> 're.Pattern[bytes]':
+    if isinstance(pattern, re.Pattern):
+        if not isinstance(pattern.pattern, bytes):
+            raise TypeError('pattern must be a bytes regex')
+        return pattern
+    if isinstance(pattern, str):
+        pattern = pattern.encode()
+    return re.compile(pattern, re.MULTILINE | (re.IGNORECASE if ignore_case else 0))
+
+
+def _search(regex: 're.Pattern[bytes]', path: str,
+            max_size: Optional[int]) -> List[Tuple[int, bytes]]:
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size or max_size is not None and size > max_size:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                if is_binary(m):
+                    return []
+                hits = []
+                line_no, counted = 1, 0
+                pos = 0
+                while True:
+                    found = regex.search(m, pos)
+                    if found is None:
+                        break
+                    at = found.start()
+                    if at == len(m) and m[-1:] == b'\n':
+                        # Past the final newline: there is no line there.
+                        break
+                    start = m.rfind(b'\n', 0, at) + 1
+                    end = m.find(b'\n', at)
+                    if end < 0:
+                        end = len(m)
+                    # grep matches within lines: a match running into the
+                    # newline only counts if the line matches on its own.
+                    if found.end() > end and regex.search(m, start, end) is None:
+                        pos = end + 1
+                        if pos > len(m):
+                            break
+                        continue
+                    # Count newlines only over the stretch since the last
+                    # hit, so line numbering stays linear in the file size.
+                    line_no += m[counted:start].count(b'\n')
+                    counted = start
+                    hits.append((line_no, m[start:end]))
+                    pos = end + 1
+                    if pos > len(m):
+                        break
+                return hits
+    except (OSError, ValueError):
+        # Unreadable, vanished, or not mappable (e.g. a FIFO): no matches.
+        return []
+
+
+def _init_worker(regex: 're.Pattern[bytes]') -> None:
+    global _regex
+    _regex = regex
+
+
+def _search_batch(paths: List[str], max_size: Optional[int]):
+    return [(p, _search(_regex, p, max_size)) for p in paths]
+
+
+def _batches(paths: Iterable[str], size: int) -> Iterator[List[str]]:
+    batch = []
+    for path in paths:
+        batch.append(os.fspath(path))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _results(path: str, hits, text: bool) -> Iterator[Match]:
+    for line_no, line in hits:
+        if line.endswith(b'\r'):
+            line = line[:-1]
+        yield Match(path, line_no, line.decode(errors='replace') if text else line)
+
+
+def grep(paths: Iterable[str], pattern: Pattern, workers: Optional[int] = None,
+         ignore_case: bool = False, text: bool = False,
+         max_size: Optional[int] = None,
+         batch_size: int = BATCH_SIZE) -> Iterator[Match]:
+    """Yield a :class:`Match` for every line of ``paths`` matching ``pattern``.
+
+    ``pattern`` is a bytes (or str, encoded as UTF-8) regular expression
+    searched with ``re.MULTILINE``.  Paths are consumed lazily in batches of
+    ``batch_size`` with a bounded number in flight, so an endless walk can
+    be searched; results arrive per file, in completion order.  ``workers``
+    defaults to the CPU count; ``workers=1`` searches in this process.
+    Files larger than ``max_size`` are skipped.
+    """
+    regex = _compile(pattern, ignore_case)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for path in paths:
+            path = os.fspath(path)
+            yield from _results(path, _search(regex, path, max_size), text)
+        return
+    batches = _batches(paths, batch_size)
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(regex,)) as pool:
+        pending = set()
+        try:
+            for batch in batches:
+                pending.add(pool.submit(_search_batch, batch, max_size))
+                if len(pending) < workers * 2:
+                    continue
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for path, hits in future.result():
+                        yield from _results(path, hits, text)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for path, hits in future.result():
+                        yield from _results(path, hits, text)
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def grep_tree(roots: Patterns, pattern: Pattern, include: Patterns = None,
+              exclude: Patterns = None, workers: Optional[int] = None,
+              ignore_case: bool = False, text: bool = False,
+              max_size: Optional[int] = None, **walk_kwargs) -> Iterator[Match]:
+    """:func:`grep` over ``walk_files(roots, include, exclude, ...)``.
+
+    Extra keyword arguments (``traversal``, ``cancel``, ...) go to
+    :func:`~linux_overview.walk.walk_files`.
+    """
+    return grep(walk_files(roots, include, exclude, **walk_kwargs), pattern,
+                workers, ignore_case, text, max_size)
@@ -0,0 +1,314 @@
+"""Long-lived helper process that runs commands on the caller's behalf.
+
+``echo $HOME``, ``whoami`` and ``id`` are trivial, yet each one is a fresh
+fork of the (possibly huge) interpreter.  :class:`CommandHelper` starts one
+small Python process, ideally early while the parent is still small, and
+talks to it over a ``socketpair``.  The helper forks the commands, streams
+their output back and reports their exit status; any number of requests are
+multiplexed over the one channel, so launch latency no longer depends on the
+size of the main process::
+
+    from linux_overview.helper import CommandHelper
+
+    with CommandHelper() as helper:
+        helper.run(['whoami'], text=True).stdout
+        futures = [helper.submit(['id']), helper.submit(['uname', '-a'])]
+        for kind, chunk in helper.stream(['ls', '-l', '/usr/bin']):
+            ...
+
+Every frame on the socket is ``<length u32><request id u32><kind u8>``
+followed by ``length`` payload bytes.  Kinds: ``R`` run (JSON options, then
+raw stdin data), ``K`` kill, ``O``/``E`` stdout/stderr chunk, ``X`` exit
+(JSON with ``returncode`` or ``error``).
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import queue
+import socket
+import struct
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+_FRAME = struct.Struct('<IIc')
+_JSON_LEN = struct.Struct('<I')
+CHUNK_SIZE = 65536
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    buf = bytearray(size)
+    view = memoryview(buf)
+    got = 0
+    while got < size:
+        n = sock.recv_into(view[got:])
+        if not n:
+            return None
+        got += n
+    return bytes(buf)
+
+
+def _recv_frame(sock: socket.socket) -> Optional[Tuple[int, bytes, bytes]]:
+    header = _recv_exact(sock, _FRAME.size)
+    if header is None:
+        return None
+    length, rid, kind = _FRAME.unpack(header)
+    payload = _recv_exact(sock, length) if length else b''
+    if payload is None:
+        return None
+    return rid, kind, payload
+
+
+class _Channel:
+    """Thread-safe frame writer over one socket."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self._lock = threading.Lock()
+
+    def send(self, rid: int, kind: bytes, payload: bytes = b'') -> None:
+        with self._lock:
+            self.sock.sendall(_FRAME.pack(len(payload), rid, kind) + payload)
+
+
+# -- helper side --------------------------------------------------------
+
+
+def _pump(stream, channel: _Channel, rid: int, kind: bytes) -> None:
+    for chunk in iter(lambda: stream.read1(CHUNK_SIZE), b''):
+        channel.send(rid, kind, chunk)
+    stream.close()
+
+
+def _handle(channel: _Channel, procs: Dict[int, subprocess.Popen], rid: int,
+            options: dict, data: bytes) -> None:
+    try:
+        proc = subprocess.Popen(options['args'], cwd=options.get('cwd'),
+                                env=options.get('env'),
+                                stdin=subprocess.PIPE if data else subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        channel.send(rid, b'X', json.dumps(
+            {'error': e.strerror or str(e), 'errno': e.errno}).encode())
+        return
+    procs[rid] = proc
+    readers = [threading.Thread(target=_pump, args=(proc.stderr, channel, rid, b'E'),
+                                daemon=True)]
+    if data:
+        def feed():
+            try:
+                proc.stdin.write(data)
+            except BrokenPipeError:
+                pass
+            finally:
+                try:
+                    proc.stdin.close()
+                except BrokenPipeError:
+                    pass
+        readers.append(threading.Thread(target=feed, daemon=True))
+    for t in readers:
+        t.start()
+    _pump(proc.stdout, channel, rid, b'O')
+    for t in readers:
+        t.join()
+    returncode = proc.wait()
+    procs.pop(rid, None)
+    channel.send(rid, b'X', json.dumps({'returncode': returncode}).encode())
+
+
+def serve(fd: int) -> None:
+    """Helper main loop: serve requests on socket ``fd`` until it closes."""
+    sock = socket.socket(fileno=fd)
+    channel = _Channel(sock)
+    procs: Dict[int, subprocess.Popen] = {}
+    while True:
+        frame = _recv_frame(sock)
+        if frame is None:
+            break
+        rid, kind, payload = frame
+        if kind == b'R':
+            (size,) = _JSON_LEN.unpack_from(payload)
+            end = _JSON_LEN.size + size
+            options = json.loads(payload[_JSON_LEN.size:end])
+            threading.Thread(target=_handle, daemon=True,
+                             args=(channel, procs, rid, options,
+                                   payload[end:])).start()
+        elif kind == b'K':
+            proc = procs.get(rid)
+            if proc is not None:
+                proc.kill()
+    for proc in list(procs.values()):
+        proc.kill()
+
+
+# -- client side --------------------------------------------------------
+
+
+class _Request:
+    __slots__ = ('args', 'future', 'stdout', 'stderr', 'on_output')
+
+    def __init__(self, args, on_output):
+        self.args = args
+        self.future: Future = Future()
+        self.stdout: list = []
+        self.stderr: list = []
+        self.on_output = on_output
+
+
+class CommandHelper:
+    """Client for one helper process; safe to use from many threads."""
+
+    def __init__(self):
+        self._proc: Optional[subprocess.Popen] = None
+        self._channel: Optional[_Channel] = None
+        self._pending: Dict[int, _Request] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self) -> 'CommandHelper':
+        if self._proc is not None:
+            return self
+        parent, child = socket.socketpair()
+        env = dict(os.environ)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env['PYTHONPATH'] = os.pathsep.join(
+            p for p in (root, env.get('PYTHONPATH')) if p)
+        try:
+            self._proc = subprocess.Popen(
+                [sys.executable, '-m', 'linux_overview.helper',
+                 str(child.fileno())],
+                pass_fds=(child.fileno(),), env=env,
+                stdin=subprocess.DEVNULL)
+        finally:
+            child.close()
+        self._channel = _Channel(parent)
+        threading.Thread(target=self._read, args=(parent,), daemon=True).start()
+        return self
+
+    def _read(self, sock: socket.socket) -> None:
+        while True:
+            frame = _recv_frame(sock)
+            if frame is None:
+                break
+            rid, kind, payload = frame
+            with self._lock:
+                req = self._pending.get(rid)
+            if req is None:
+                continue
+            if kind in (b'O', b'E'):
+                if req.on_output is not None:
+                    req.on_output('stdout' if kind == b'O' else 'stderr', payload)
+                else:
+                    (req.stdout if kind == b'O' else req.stderr).append(payload)
+                continue
+            with self._lock:
+                self._pending.pop(rid, None)
+            status = json.loads(payload)
+            if 'error' in status:
+                err = OSError(status.get('errno'), status['error'], req.args[0])
+                req.future.set_exception(err)
+            else:
+                req.future.set_result(subprocess.CompletedProcess(
+                    req.args, status['returncode'], b''.join(req.stdout),
+                    b''.join(req.stderr)))
+        # Helper gone: nothing pending can complete any more.
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for req in pending.values():
+            req.future.set_exception(BrokenPipeError('command helper exited'))
+
+    def submit(self, args: Sequence[str], input: Optional[bytes] = None,
+               cwd: Optional[str] = None, env: Optional[dict] = None,
+               on_output: Optional[Callable[[str, bytes], None]] = None) -> Future:
+        """Start ``args`` in the helper; the future resolves to a
+        ``CompletedProcess`` with bytes output.
+
+        With ``on_output`` every chunk is passed to the callback (on the
+        reader thread) as ``('stdout' | 'stderr', bytes)`` instead of being
+        collected.
+        """
+        self.start()
+        args = [os.fspath(a) for a in args]
+        rid = next(self._ids)
+        req = _Request(args, on_output)
+        req.future.rid = rid
+        options = json.dumps({'args': args, 'cwd': cwd, 'env': env}).encode()
+        with self._lock:
+            self._pending[rid] = req
+        self._channel.send(rid, b'R', _JSON_LEN.pack(len(options)) + options
+                           + (input or b''))
+        return req.future
+
+    def kill(self, future: Future) -> None:
+        """Kill the command behind a future returned by :meth:`submit`."""
+        self._channel.send(future.rid, b'K')
+
+    def run(self, args: Sequence[str], input=None, cwd=None, env=None,
+            timeout: Optional[float] = None, text: bool = False,
+            check: bool = False) -> subprocess.CompletedProcess:
+        """Blocking run with ``subprocess.run``-like results."""
+        if text and isinstance(input, str):
+            input = input.encode()
+        future = self.submit(args, input, cwd, env)
+        try:
+            result = future.result(timeout)
+        except FutureTimeout:
+            self.kill(future)
+            raise subprocess.TimeoutExpired(args, timeout)
+        if text:
+            result.stdout = result.stdout.decode(errors='replace')
+            result.stderr = result.stderr.decode(errors='replace')
+        if check:
+            result.check_returncode()
+        return result
+
+    def stream(self, args: Sequence[str], input=None, cwd=None,
+               env=None) -> Iterator[Tuple[str, bytes]]:
+        """Yield ``('stdout' | 'stderr', chunk)`` as the command produces them.
+
+        The exit status is available as ``returncode`` on the
+        ``StopIteration`` value, i.e. ``result = yield from helper.stream(...)``.
+        """
+        chunks: queue.Queue = queue.Queue()
+        future = self.submit(args, input, cwd, env,
+                             on_output=lambda kind, data: chunks.put((kind, data)))
+        future.add_done_callback(lambda f: chunks.put(None))
+        try:
+            while True:
+                item = chunks.get()
+                if item is None:
+                    break
+                yield item
+        finally:
+            if not future.done():
+                self.kill(future)
+        return future.result().returncode
+
+    def close(self) -> None:
+        """Stop the helper; running commands are killed."""
+        if self._proc is None:
+            return
+        # shutdown() wakes the reader thread and gives the helper its EOF;
+        # close() alone would not while a recv() is still blocked on it.
+        try:
+            self._channel.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._channel.sock.close()
+        self._proc.wait()
+        self._proc = None
+
+    def __enter__(self) -> 'CommandHelper':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+if __name__ == '__main__':
+    serve(int(sys.argv[1]))
@@ -0,0 +1,361 @@
+"""Persistent, locate-style filename index.
+
+The walkthrough re-runs ``find`` over ``/``, ``/etc``, ``/usr/bin`` and
+``/var/lib/docker`` again and again.  :class:`PathIndex` walks the tree once,
+keeps the listing of every directory together with its mtime and answers
+name queries from memory::
+
+    from linux_overview.index import open_index
+
+    idx = open_index('/var/tmp/paths.idx', roots=['/'])
+    idx.find('*.py', exclude='*/lib2to3/*')
+    idx.find('*/bin/activate')
+
+:meth:`PathIndex.refresh` only re-reads directories whose mtime changed;
+adding, removing or renaming an entry always bumps the mtime of the directory
+holding it.  Only non-directory entries (files, symlinks, sockets, ...) are
+indexed.
+
+On disk the index is a single file: directory paths in sorted order and the
+entry names of each directory, both front-coded against their predecessor,
+followed by a trigram table over entry names (posting lists of entry ids).
+"""
+
+from __future__ import annotations
+
+import array
+import fnmatch
+import json
+import os
+import re
+import struct
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .walk import Patterns, _as_list, compile_globs
+
+MAGIC = b'LOVIDX1\n'
+
+DEFAULT_PRUNE = ('/proc', '/sys', '/dev', '/run')
+
+_MTIME = struct.Struct('<q')
+_WILDCARD = re.compile(r'\[!?\]?[^\]]*\]|[*?]')
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(buf, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _put_str(out: bytearray, prev: bytes, cur: bytes) -> None:
+    shared = len(os.path.commonprefix([prev, cur]))
+    _put_varint(out, shared)
+    _put_varint(out, len(cur) - shared)
+    out += cur[shared:]
+
+
+def _get_str(buf, pos: int, prev: bytes) -> Tuple[bytes, int]:
+    shared, pos = _get_varint(buf, pos)
+    size, pos = _get_varint(buf, pos)
+    end = pos + size
+    return prev[:shared] + bytes(buf[pos:end]), end
+
+
+def _trigrams(data: bytes) -> set:
+    return {data[i:i + 3] for i in range(len(data) - 2)}
+
+
+def _literals(pattern: str) -> List[str]:
+    """Literal runs that every name matching ``pattern`` must contain."""
+    if '/' not in pattern:
+        return [p for p in _WILDCARD.split(pattern) if p]
+    # Full-path pattern: only the text after the last wildcard is known to
+    # end the path, and of that only the part after the last slash is
+    # guaranteed to be inside the entry name.
+    tail = _WILDCARD.split(pattern)[-1].rpartition('/')[2]
+    return [tail] if tail else []
+
+
+class PathIndex:
+    """Directory listings plus a trigram table over entry names."""
+
+    def __init__(self, roots: Patterns = '/', prune: Iterable[str] = DEFAULT_PRUNE):
+        self.roots = [os.path.abspath(r) for r in _as_list(roots)]
+        self.prune = frozenset(os.path.abspath(p) for p in prune)
+        # directory path -> (mtime_ns, sorted entry names)
+        self._dirs: Dict[str, Tuple[int, List[str]]] = {}
+        self._dirnames: List[str] = []
+        self._names: List[str] = []
+        self._parent = array.array('I')
+        self._grams: Dict[bytes, array.array] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    # -- building -------------------------------------------------------
+
+    @classmethod
+    def build(cls, roots: Patterns = '/',
+              prune: Iterable[str] = DEFAULT_PRUNE) -> 'PathIndex':
+        """Walk ``roots`` and return a fresh index."""
+        index = cls(roots, prune)
+        for root in index.roots:
+            index._scan_tree(root)
+        index._flatten()
+        return index
+
+    def _scan_dir(self, path: str) -> Optional[List[str]]:
+        """(Re)read one directory and return its subdirectories."""
+        try:
+            mtime = os.lstat(path).st_mtime_ns
+        except OSError:
+            self._dirs.pop(path, None)
+            return None
+        names = []
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if not is_dir:
+                        names.append(entry.name)
+                    elif entry.path not in self.prune:
+                        subdirs.append(entry.path)
+        except OSError:
+            pass
+        names.sort()
+        self._dirs[path] = (mtime, names)
+        return subdirs
+
+    def _scan_tree(self, root: str) -> int:
+        stack = [root]
+        count = 0
+        while stack:
+            subdirs = self._scan_dir(stack.pop())
+            if subdirs is not None:
+                count += 1
+                stack.extend(subdirs)
+        return count
+
+    def _drop_tree(self, path: str) -> None:
+        prefix = path.rstrip('/') + '/'
+        for key in [k for k in self._dirs if k == path or k.startswith(prefix)]:
+            del self._dirs[key]
+
+    def refresh(self) -> int:
+        """Re-read directories whose mtime changed; return how many were read."""
+        rescanned = 0
+        children: Dict[str, set] = {}
+        for d in self._dirs:
+            children.setdefault(os.path.dirname(d), set()).add(d)
+        for path in sorted(self._dirs):
+            entry = self._dirs.get(path)
+            if entry is None:
+                continue  # dropped together with a parent earlier in this pass
+            try:
+                st = os.lstat(path)
+            except OSError:
+                self._drop_tree(path)
+                continue
+            if st.st_mtime_ns == entry[0]:
+                continue
+            old = children.get(path, set())
+            new = set(self._scan_dir(path) or ())
+            rescanned += 1
+            for gone in old - new:
+                self._drop_tree(gone)
+            for added in new - old:
+                rescanned += self._scan_tree(added)
+        for root in self.roots:
+            if root not in self._dirs:
+                rescanned += self._scan_tree(root)
+        if rescanned:
+            self._flatten()
+        return rescanned
+
+    def _flatten(self) -> None:
+        dirnames = sorted(self._dirs)
+        names: List[str] = []
+        parent = array.array('I')
+        for i, d in enumerate(dirnames):
+            entries = self._dirs[d][1]
+            names.extend(entries)
+            parent.extend([i] * len(entries))
+        grams: Dict[bytes, array.array] = {}
+        for i, name in enumerate(names):
+            for g in _trigrams(os.fsencode(name)):
+                postings = grams.get(g)
+                if postings is None:
+                    postings = grams[g] = array.array('I')
+                postings.append(i)
+        self._dirnames, self._names, self._parent, self._grams = (
+            dirnames, names, parent, grams)
+
+    # -- querying -------------------------------------------------------
+
+    def _candidates(self, literals: List[str]) -> Optional[List[int]]:
+        grams = set()
+        for lit in literals:
+            grams |= _trigrams(os.fsencode(lit))
+        if not grams:
+            return None
+        postings = sorted((self._grams.get(g, ()) for g in grams), key=len)
+        result = set(postings[0])
+        for p in postings[1:]:
+            if not result:
+                break
+            result.intersection_update(p)
+        return sorted(result)
+
+    def find(self, pattern: str, exclude: Patterns = None,
+             limit: Optional[int] = None) -> List[str]:
+        """Return indexed paths matching a glob.
+
+        A pattern without ``/`` is matched against entry names (``-name``);
+        one containing ``/`` against the full path (``-path``).  ``exclude``
+        globs are tested against the full path and against the directory
+        path with a trailing slash, as in :func:`~linux_overview.walk.walk_files`.
+        """
+        by_path = '/' in pattern
+        match = re.compile(fnmatch.translate(pattern)).match
+        excluded = compile_globs(exclude)
+        candidates = self._candidates(_literals(pattern))
+        ids = range(len(self._names)) if candidates is None else candidates
+        names, dirnames, parent = self._names, self._dirnames, self._parent
+        found = []
+        for i in ids:
+            if not by_path and match(names[i]) is None:
+                continue
+            d = dirnames[parent[i]]
+            path = os.path.join(d, names[i])
+            if by_path and match(path) is None:
+                continue
+            if excluded is not None and (
+                    excluded(path) or excluded(d.rstrip('/') + '/')):
+                continue
+            found.append(path)
+            if limit is not None and len(found) >= limit:
+                break
+        return found
+
+    # -- persistence ----------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """Write the index atomically to ``path``."""
+        out = bytearray(MAGIC)
+        meta = json.dumps({'roots': self.roots,
+                           'prune': sorted(self.prune)}).encode()
+        _put_varint(out, len(meta))
+        out += meta
+        _put_varint(out, len(self._dirs))
+        prev_dir = b''
+        for d in sorted(self._dirs):
+            mtime, entries = self._dirs[d]
+            cur = os.fsencode(d)
+            _put_str(out, prev_dir, cur)
+            prev_dir = cur
+            out += _MTIME.pack(mtime)
+            _put_varint(out, len(entries))
+            prev = b''
+            for name in entries:
+                cur = os.fsencode(name)
+                _put_str(out, prev, cur)
+                prev = cur
+        _put_varint(out, len(self._grams))
+        for g in sorted(self._grams):
+            postings = self._grams[g]
+            if sys.byteorder != 'little':
+                postings = array.array('I', postings)
+                postings.byteswap()
+            _put_varint(out, len(g))
+            out += g
+            _put_varint(out, len(postings))
+            out += postings.tobytes()
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp, 'wb') as f:
+            f.write(out)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'PathIndex':
+        """Read an index written by :meth:`save`."""
+        with open(path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(MAGIC):
+            raise ValueError('%s is not a path index' % path)
+        buf = memoryview(data)
+        pos = len(MAGIC)
+        size, pos = _get_varint(buf, pos)
+        meta = json.loads(bytes(buf[pos:pos + size]))
+        pos += size
+        index = cls(meta['roots'], meta['prune'])
+        ndirs, pos = _get_varint(buf, pos)
+        dirnames = []
+        names: List[str] = []
+        parent = array.array('I')
+        prev_dir = b''
+        for i in range(ndirs):
+            prev_dir, pos = _get_str(buf, pos, prev_dir)
+            (mtime,) = _MTIME.unpack_from(buf, pos)
+            pos += _MTIME.size
+            count, pos = _get_varint(buf, pos)
+            entries = []
+            prev = b''
+            for _ in range(count):
+                prev, pos = _get_str(buf, pos, prev)
+                entries.append(os.fsdecode(prev))
+            d = os.fsdecode(prev_dir)
+            index._dirs[d] = (mtime, entries)
+            dirnames.append(d)
+            names.extend(entries)
+            parent.extend([i] * count)
+        ngrams, pos = _get_varint(buf, pos)
+        grams = {}
+        for _ in range(ngrams):
+            size, pos = _get_varint(buf, pos)
+            g = bytes(buf[pos:pos + size])
+            pos += size
+            count, pos = _get_varint(buf, pos)
+            postings = array.array('I')
+            end = pos + count * postings.itemsize
+            postings.frombytes(buf[pos:end])
+            if sys.byteorder != 'little':
+                postings.byteswap()
+            pos = end
+            grams[g] = postings
+        index._dirnames, index._names, index._parent, index._grams = (
+            dirnames, names, parent, grams)
+        return index
+
+
+def open_index(path: str, roots: Patterns = '/',
+               prune: Iterable[str] = DEFAULT_PRUNE) -> PathIndex:
+    """Load the index at ``path``, refreshing it, or build it on first use."""
+    try:
+        index = PathIndex.load(path)
+    except (OSError, ValueError):
+        index = None
+    wanted = [os.path.abspath(r) for r in _as_list(roots)]
+    if index is None or index.roots != wanted:
+        index = PathIndex.build(wanted, prune)
+        index.save(path)
+        return index
+    if index.refresh():
+        index.save(path)
+    return index
@@ -0,0 +1,305 @@
+"""Jupyter kernel connection files, parsed once and cached.
+
+The home directory in the walkthrough holds ``kernel-*.json`` connection
+files that were read as raw strings and printed.  :class:`KernelDirectory`
+parses them into compact :class:`KernelConnection` records and keeps them
+keyed by ``(device, inode, mtime, size)``, so a rescan only opens files that
+are new or were rewritten::
+
+    from linux_overview.kernels import KernelDirectory
+
+    kernels = KernelDirectory('/home/sandbox')
+    for conn in kernels.scan().values():
+        print(conn.kernel_name, conn.ip, conn.shell_port)
+
+    for added in kernels.watch(interval=1.0):
+        ...   # lists of kernels that appeared since the last poll
+
+    [status.connection.path for status in kernels.liveness()
+     if status.state == 'dead']            # stale connection files
+    await kernels.liveness_async()         # inside an event loop (Jupyter)
+
+Liveness only says whether something accepts connections on a kernel's
+ports; a port reused by an unrelated process still counts as up.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (Dict, Iterable, Iterator, List, NamedTuple, Optional,
+                    Set, Tuple)
+
+from .netstat import read_inet
+from .probe import probe_many
+
+PORT_NAMES = ('shell_port', 'iopub_port', 'stdin_port', 'control_port',
+              'hb_port')
+
+DEFAULT_PATTERN = 'kernel-*.json'
+
+PROBE_TIMEOUT = 0.2
+
+# Directory timestamps are coarse (a clock tick, up to seconds on some
+# filesystems): a file created in the same tick as a scan leaves the mtime
+# unchanged.  An mtime this close to the scan doesn't vouch for it.
+MTIME_SLACK_NS = 2 * 10**9
+
+_WILDCARDS = ('0.0.0.0', '::')
+
+
+class KernelConnection:
+    """One connection file: its five ports, address and signing settings."""
+
+    __slots__ = ('path',) + PORT_NAMES + ('ip', 'key', 'transport',
+                                          'signature_scheme', 'kernel_name')
+
+    def __init__(self, path: str, shell_port: int, iopub_port: int,
+                 stdin_port: int, control_port: int, hb_port: int,
+                 ip: str = '127.0.0.1', key: str = '', transport: str = 'tcp',
+                 signature_scheme: str = 'hmac-sha256', kernel_name: str = ''):
+        self.path = path
+        self.shell_port = shell_port
+        self.iopub_port = iopub_port
+        self.stdin_port = stdin_port
+        self.control_port = control_port
+        self.hb_port = hb_port
+        self.ip = ip
+        self.key = key
+        self.transport = transport
+        self.signature_scheme = signature_scheme
+        self.kernel_name = kernel_name
+
+    @classmethod
+    def from_dict(cls, path: str, info: dict) -> 'KernelConnection':
+        return cls(path, *(int(info[name]) for name in PORT_NAMES),
+                   ip=info.get('ip', '127.0.0.1'), key=info.get('key', ''),
+                   transport=info.get('transport', 'tcp'),
+                   signature_scheme=info.get('signature_scheme', 'hmac-sha256'),
+                   kernel_name=info.get('kernel_name', ''))
+
+    @property
+    def ports(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in PORT_NAMES}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, KernelConnection):
+            return NotImplemented
+        return all(getattr(self, s) == getattr(other, s) for s in self.__slots__)
+
+    def __repr__(self) -> str:
+        return '<KernelConnection %s %s %s:%d>' % (
+            os.path.basename(self.path), self.kernel_name or '?', self.ip,
+            self.shell_port)
+
+
+def load_connection(path: str) -> KernelConnection:
+    """Parse a single connection file (no caching)."""
+    with open(path, 'rb') as f:
+        return KernelConnection.from_dict(path, json.loads(f.read()))
+
+
+class KernelStatus(NamedTuple):
+    connection: 'KernelConnection'
+    up: Tuple[str, ...]
+    down: Tuple[str, ...]
+    probed: int
+
+    @property
+    def state(self) -> str:
+        """``alive`` (all ports up), ``partial`` or ``dead`` (none up)."""
+        if not self.down:
+            return 'alive'
+        return 'partial' if self.up else 'dead'
+
+
+def _tcp_listeners() -> Set[Tuple[str, int]]:
+    listeners = set()
+    for proto in ('tcp', 'tcp6'):
+        for sock in read_inet(proto):
+            if sock.state == 'LISTEN':
+                listeners.add((sock.local_address, sock.local_port))
+    return listeners
+
+
+def _plan(connections: List['KernelConnection']
+          ) -> Tuple[Dict[Tuple[str, int], bool], List[Tuple[str, int]]]:
+    # (ip, port) -> up as far as /proc/net shows, and the keys to probe.
+    listeners = _tcp_listeners()
+    up: Dict[Tuple[str, int], bool] = {}
+    to_probe = []
+    for conn in connections:
+        if conn.transport != 'tcp':
+            continue
+        for port in conn.ports.values():
+            key = (conn.ip, port)
+            if key in up:
+                continue
+            if key in listeners or any((w, port) in listeners for w in _WILDCARDS):
+                up[key] = True
+            else:
+                up[key] = False
+                to_probe.append(key)
+    return up, to_probe
+
+
+def _statuses(connections: List['KernelConnection'],
+              up: Dict[Tuple[str, int], bool],
+              to_probe: List[Tuple[str, int]]) -> List[KernelStatus]:
+    probed = set(to_probe)
+    statuses = []
+    for conn in connections:
+        names_up, names_down, count = [], [], 0
+        for name, port in conn.ports.items():
+            key = (conn.ip, port)
+            count += key in probed
+            (names_up if conn.transport == 'tcp' and up[key]
+             else names_down).append(name)
+        statuses.append(KernelStatus(conn, tuple(names_up), tuple(names_down),
+                                     count))
+    return statuses
+
+
+async def check_liveness_async(connections: Iterable['KernelConnection'],
+                               timeout: float = PROBE_TIMEOUT,
+                               limit: int = 256) -> List[KernelStatus]:
+    """:func:`check_liveness` for callers already inside an event loop."""
+    connections = list(connections)
+    up, to_probe = _plan(connections)
+    if to_probe:
+        for report in await probe_many(to_probe, timeout=timeout, limit=limit):
+            up[(report.host, report.port)] = report.reachable
+    return _statuses(connections, up, to_probe)
+
+
+def check_liveness(connections: Iterable['KernelConnection'],
+                   timeout: float = PROBE_TIMEOUT,
+                   limit: int = 256) -> List[KernelStatus]:
+    """Which ports of each kernel accept connections.
+
+    Ports visibly listening in ``/proc/net/tcp{,6}`` (this network
+    namespace) need no connect; only the rest are probed, all of them
+    concurrently, each attempt bounded by ``timeout``.  Non-TCP transports
+    (``ipc``) are reported with every port down.
+
+    Called while an event loop runs in this thread (a Jupyter cell), the
+    probes run on a loop in a worker thread and this call blocks; ``await
+    check_liveness_async(...)`` there instead to keep the loop serving.
+    """
+    check = check_liveness_async(list(connections), timeout, limit)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(check)
+    with ThreadPoolExecutor(1) as pool:
+        return pool.submit(asyncio.run, check).result()
+
+
+def _stat_key(st: os.stat_result) -> Tuple[int, int, int, int]:
+    return st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class KernelDirectory:
+    """Cached view of the connection files in one directory.
+
+    Files that fail to parse are remembered in :attr:`errors` (also keyed
+    by their stat identity, so a broken file is not re-read either).
+    """
+
+    def __init__(self, directory: str, pattern: str = DEFAULT_PATTERN):
+        self.directory = directory
+        self.pattern = pattern
+        self.errors: Dict[str, str] = {}
+        # path -> (stat key, record or None when the file is broken)
+        self._cache: Dict[str, Tuple[tuple, Optional[KernelConnection]]] = {}
+        self._dir_mtime: Optional[int] = None
+        # Whether the last scan ran well after _dir_mtime (see poll()).
+        self._settled = False
+        self._lock = threading.Lock()
+
+    def scan(self) -> Dict[str, KernelConnection]:
+        """Return ``{path: record}`` for every parseable connection file."""
+        with self._lock:
+            started = time.time_ns()
+            try:
+                self._dir_mtime = os.stat(self.directory).st_mtime_ns
+                entries = list(os.scandir(self.directory))
+            except OSError:
+                entries = []
+            self._settled = (self._dir_mtime is not None
+                             and started - self._dir_mtime >= MTIME_SLACK_NS)
+            fresh: Dict[str, Tuple[tuple, Optional[KernelConnection]]] = {}
+            for entry in entries:
+                if not fnmatch.fnmatchcase(entry.name, self.pattern):
+                    continue
+                try:
+                    key = _stat_key(entry.stat())
+                except OSError:
+                    continue
+                cached = self._cache.get(entry.path)
+                if cached is None or cached[0] != key:
+                    try:
+                        cached = (key, load_connection(entry.path))
+                        self.errors.pop(entry.path, None)
+                    except (OSError, ValueError, KeyError, TypeError) as e:
+                        cached = (key, None)
+                        self.errors[entry.path] = str(e)
+                fresh[entry.path] = cached
+            for path in set(self.errors) - set(fresh):
+                del self.errors[path]
+            self._cache = fresh
+            return {p: rec for p, (_, rec) in fresh.items() if rec is not None}
+
+    def connections(self) -> List[KernelConnection]:
+        return sorted(self.scan().values(), key=lambda c: c.path)
+
+    def poll(self) -> Tuple[List[KernelConnection], List[str]]:
+        """Rescan if the directory changed; return ``(added, removed paths)``.
+
+        Creating, deleting or renaming a file updates the directory mtime,
+        so an unchanged directory costs a single ``stat``.  Until the mtime
+        is :data:`MTIME_SLACK_NS` older than the last scan, every poll
+        rescans: changes within the same timestamp tick would not show.
+        """
+        try:
+            mtime = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime is not None and mtime == self._dir_mtime and self._settled:
+            return [], []
+        before = {p: rec for p, (_, rec) in self._cache.items()}
+        after = self.scan()
+        added = [rec for p, rec in after.items() if before.get(p) is not rec]
+        # Compare files, not parsed records: a broken file is not removed.
+        removed = [p for p in before if p not in self._cache]
+        added.sort(key=lambda c: c.path)
+        return added, sorted(removed)
+
+    def liveness(self, timeout: float = PROBE_TIMEOUT) -> List[KernelStatus]:
+        """:func:`check_liveness` for every kernel in the directory."""
+        return check_liveness(self.connections(), timeout)
+
+    async def liveness_async(self, timeout: float = PROBE_TIMEOUT) -> List[KernelStatus]:
+        """:func:`check_liveness_async` for every kernel in the directory."""
+        return await check_liveness_async(self.connections(), timeout)
+
+    def watch(self, interval: float = 1.0,
+              stop: Optional[threading.Event] = None) -> Iterator[List[KernelConnection]]:
+        """Yield lists of newly appearing (or replaced) kernels.
+
+        The first batch is everything already present.  Polls every
+        ``interval`` seconds until ``stop`` is set.
+        """
+        stop = stop or threading.Event()
+        first = self.connections()
+        if first:
+            yield first
+        while not stop.wait(interval):
+            added, _ = self.poll()
+            if added:
+                yield added
@@ -0,0 +1,275 @@
+"""Interface and address inventory without ``ip addr``.
+
+``ip`` was missing, so the IP configuration step printed nothing.
+:func:`interfaces` reads names, MACs, MTUs and link state from
+``/sys/class/net`` and attaches the addresses from one rtnetlink
+``RTM_GETADDR`` dump over an ``AF_NETLINK`` socket (the same request ``ip
+addr`` makes).  :class:`RateSampler` turns the byte/packet counters of
+``/proc/net/dev`` into per-second rates::
+
+    from linux_overview.netif import RateSampler, interfaces
+
+    for iface in interfaces():
+        print(iface.name, iface.mac, iface.mtu, iface.operstate,
+              [(a.address, a.prefixlen) for a in iface.addresses])
+
+    sampler = RateSampler()
+    sampler.sample()          # primes the counters
+    time.sleep(1)
+    sampler.sample()['eth0'].rx_bytes
+
+Where netlink is unavailable IPv6 addresses still come from
+``/proc/net/if_inet6``; IPv4 addresses then stay unknown.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import struct
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+SYS_CLASS_NET = '/sys/class/net'
+PROC_NET_DEV = '/proc/net/dev'
+IF_INET6 = '/proc/net/if_inet6'
+
+IFF_UP = 0x1
+IFF_LOOPBACK = 0x8
+
+# linux/netlink.h, linux/rtnetlink.h, linux/if_addr.h
+_NLMSG_ERROR = 2
+_NLMSG_DONE = 3
+_NLM_F_REQUEST = 0x1
+_NLM_F_DUMP = 0x300
+_RTM_NEWADDR = 20
+_RTM_GETADDR = 22
+_IFA_ADDRESS = 1
+_IFA_LOCAL = 2
+_IFA_LABEL = 3
+
+_NLMSGHDR = struct.Struct('=IHHII')
+_IFADDRMSG = struct.Struct('=BBBBI')
+_RTATTR = struct.Struct('=HH')
+
+SCOPES = {0: 'global', 200: 'site', 253: 'link', 254: 'host', 255: 'nowhere'}
+
+COUNTERS = ('rx_bytes', 'rx_packets', 'tx_bytes', 'tx_packets')
+
+
+class Address(NamedTuple):
+    ifindex: int
+    family: int
+    address: str
+    prefixlen: int
+    scope: str
+    label: str
+
+
+class Interface(NamedTuple):
+    name: str
+    index: int
+    mac: str
+    mtu: int
+    operstate: str
+    flags: int
+    addresses: Tuple[Address, ...]
+
+    @property
+    def up(self) -> bool:
+        return bool(self.flags & IFF_UP)
+
+    @property
+    def loopback(self) -> bool:
+        return bool(self.flags & IFF_LOOPBACK)
+
+
+class Rates(NamedTuple):
+    """Per-second deltas of the :data:`COUNTERS`."""
+    rx_bytes: float
+    rx_packets: float
+    tx_bytes: float
+    tx_packets: float
+
+
+def _read_text(path: str) -> str:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+def _align(n: int) -> int:
+    return (n + 3) & ~3
+
+
+def _parse_addr(msg: memoryview) -> Optional[Address]:
+    family, prefixlen, _, scope, index = _IFADDRMSG.unpack_from(msg)
+    attrs: Dict[int, bytes] = {}
+    pos = _align(_IFADDRMSG.size)
+    while pos + _RTATTR.size <= len(msg):
+        length, kind = _RTATTR.unpack_from(msg, pos)
+        if length < _RTATTR.size:
+            break
+        attrs[kind] = bytes(msg[pos + _RTATTR.size:pos + length])
+        pos += _align(length)
+    # IFA_LOCAL is the interface's own address; IFA_ADDRESS is the peer on
+    # point-to-point links, and the only one present for IPv6.
+    raw = attrs.get(_IFA_LOCAL) or attrs.get(_IFA_ADDRESS)
+    if raw is None or family not in (socket.AF_INET, socket.AF_INET6):
+        return None
+    label = attrs.get(_IFA_LABEL, b'').rstrip(b'\0').decode('utf-8', 'replace')
+    return Address(index, family, socket.inet_ntop(family, raw), prefixlen,
+                   SCOPES.get(scope, str(scope)), label)
+
+
+def netlink_addresses(family: int = socket.AF_UNSPEC) -> List[Address]:
+    """Dump all interface addresses with rtnetlink ``RTM_GETADDR``.
+
+    Raises :class:`OSError` where ``AF_NETLINK`` is not available.
+    """
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW,
+                       socket.NETLINK_ROUTE) as sock:
+        sock.bind((0, 0))
+        body = _IFADDRMSG.pack(family, 0, 0, 0, 0)
+        sock.send(_NLMSGHDR.pack(_NLMSGHDR.size + len(body), _RTM_GETADDR,
+                                 _NLM_F_REQUEST | _NLM_F_DUMP, 1, 0) + body)
+        addresses = []
+        buf = bytearray(1 << 16)
+        view = memoryview(buf)
+        while True:
+            n = sock.recv_into(buf)
+            pos = 0
+            while pos + _NLMSGHDR.size <= n:
+                length, kind, _, _, _ = _NLMSGHDR.unpack_from(buf, pos)
+                if length < _NLMSGHDR.size:
+                    return addresses
+                if kind == _NLMSG_DONE:
+                    return addresses
+                if kind == _NLMSG_ERROR:
+                    (code,) = struct.unpack_from('=i', buf, pos + _NLMSGHDR.size)
+                    if code:
+                        raise OSError(-code, os.strerror(-code))
+                    return addresses
+                if kind == _RTM_NEWADDR:
+                    addr = _parse_addr(view[pos + _NLMSGHDR.size:pos + length])
+                    if addr is not None:
+                        addresses.append(addr)
+                pos += _align(length)
+
+
+def _if_inet6() -> List[Address]:
+    # Fallback: "<32 hex addr> <ifindex> <prefixlen> <scope> <flags> <name>"
+    addresses = []
+    for line in _read_text(IF_INET6).splitlines():
+        fields = line.split()
+        if len(fields) < 6:
+            continue
+        raw = bytes.fromhex(fields[0])
+        scope = int(fields[3], 16)
+        addresses.append(Address(int(fields[1], 16), socket.AF_INET6,
+                                 socket.inet_ntop(socket.AF_INET6, raw),
+                                 int(fields[2], 16),
+                                 {0x10: 'host', 0x20: 'link', 0x40: 'site'}
+                                 .get(scope, 'global'), fields[5]))
+    return addresses
+
+
+def addresses() -> List[Address]:
+    """All addresses, from netlink or (IPv6 only) ``/proc/net/if_inet6``."""
+    try:
+        return netlink_addresses()
+    except OSError:
+        return _if_inet6()
+
+
+def interfaces(sys_class_net: str = SYS_CLASS_NET) -> List[Interface]:
+    """Every interface under ``/sys/class/net``, sorted by index."""
+    by_index: Dict[int, List[Address]] = {}
+    for addr in addresses():
+        by_index.setdefault(addr.ifindex, []).append(addr)
+    result = []
+    try:
+        names = os.listdir(sys_class_net)
+    except OSError:
+        names = []
+    for name in names:
+        base = os.path.join(sys_class_net, name)
+        try:
+            index = int(_read_text(base + '/ifindex'))
+        except ValueError:
+            continue
+        mtu = _read_text(base + '/mtu')
+        flags = _read_text(base + '/flags')
+        result.append(Interface(name, index, _read_text(base + '/address'),
+                                int(mtu) if mtu else 0,
+                                _read_text(base + '/operstate') or 'unknown',
+                                int(flags, 16) if flags else 0,
+                                tuple(by_index.get(index, ()))))
+    result.sort(key=lambda i: i.index)
+    return result
+
+
+class RateSampler:
+    """Per-interface byte/packet rates from successive ``/proc/net/dev`` reads.
+
+    The file is kept open and re-read with ``pread`` into a reused buffer,
+    so a sample is one system call plus parsing.
+    """
+
+    def __init__(self, path: str = PROC_NET_DEV):
+        self.path = path
+        self._fd: Optional[int] = None
+        self._buf = bytearray(1 << 16)
+        self._last: Dict[str, Tuple[int, int, int, int]] = {}
+        self._last_time: Optional[float] = None
+
+    def counters(self) -> Dict[str, Tuple[int, int, int, int]]:
+        """Raw cumulative ``(rx_bytes, rx_packets, tx_bytes, tx_packets)``."""
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDONLY)
+        n = os.preadv(self._fd, [self._buf], 0)
+        while n == len(self._buf):
+            self._buf.extend(bytes(len(self._buf)))
+            n = os.preadv(self._fd, [self._buf], 0)
+        counters = {}
+        # Two header lines, then "name: rx fields(8) tx fields(8)".
+        for line in bytes(self._buf[:n]).splitlines()[2:]:
+            name, _, rest = line.partition(b':')
+            fields = rest.split()
+            if len(fields) < 10:
+                continue
+            counters[name.strip().decode()] = (int(fields[0]), int(fields[1]),
+                                               int(fields[8]), int(fields[9]))
+        return counters
+
+    def sample(self) -> Dict[str, Rates]:
+        """Rates since the previous call (empty on the first call).
+
+        A counter that went backwards (interface re-created) reports 0.
+        """
+        now = time.monotonic()
+        current = self.counters()
+        rates = {}
+        if self._last_time is not None and now > self._last_time:
+            elapsed = now - self._last_time
+            for name, values in current.items():
+                previous = self._last.get(name)
+                if previous is None:
+                    continue
+                rates[name] = Rates(*(max(0, v - p) / elapsed
+                                      for v, p in zip(values, previous)))
+        self._last, self._last_time = current, now
+        return rates
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> 'RateSampler':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
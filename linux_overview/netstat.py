@@ -0,0 +1,266 @@
+"""Socket tables from ``/proc/net`` for hosts without ``ss`` or ``netstat``.
+
+The "list all open ports" cell failed because neither ``ss``, ``netstat`` nor
+``ip`` was installed.  The kernel exposes the same tables as text:
+:func:`read_inet` parses ``/proc/net/{tcp,tcp6,udp,udp6}`` (hex addresses,
+hex states) and :func:`read_unix` parses ``/proc/net/unix``.
+:class:`SocketTable` adds the PID column by matching socket inodes against
+the ``socket:[inode]`` links in ``/proc/[pid]/fd``::
+
+    from linux_overview.netstat import SocketTable
+
+    table = SocketTable()
+    for s in table.listening():                  # ss -tulnp
+        print(s.proto, s.local_address, s.local_port, s.pid)
+
+Decoded addresses and inode owners are cached between calls; an owner is
+re-validated with one ``readlink`` instead of rescanning every process, so
+calling :meth:`SocketTable.listening` once per second stays cheap.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+PROC = '/proc'
+
+INET_PROTOCOLS = ('tcp', 'tcp6', 'udp', 'udp6')
+
+# include/net/tcp_states.h
+TCP_STATES = {
+    0x01: 'ESTABLISHED', 0x02: 'SYN_SENT', 0x03: 'SYN_RECV',
+    0x04: 'FIN_WAIT1', 0x05: 'FIN_WAIT2', 0x06: 'TIME_WAIT', 0x07: 'CLOSE',
+    0x08: 'CLOSE_WAIT', 0x09: 'LAST_ACK', 0x0A: 'LISTEN', 0x0B: 'CLOSING',
+    0x0C: 'NEW_SYN_RECV',
+}
+
+UNIX_TYPES = {1: 'STREAM', 2: 'DGRAM', 5: 'SEQPACKET'}
+UNIX_STATES = {0: 'FREE', 1: 'UNCONNECTED', 2: 'CONNECTING', 3: 'CONNECTED',
+               4: 'DISCONNECTING'}
+
+_UDP_UNCONNECTED = 0x07
+# __SO_ACCEPTCON in the Flags column: the socket is listening.
+_UNIX_ACCEPTCON = 0x10000
+
+
+class InetSocket(NamedTuple):
+    proto: str
+    local_address: str
+    local_port: int
+    remote_address: str
+    remote_port: int
+    state: str
+    uid: int
+    inode: int
+    pid: Optional[int] = None
+
+    @property
+    def listening(self) -> bool:
+        """LISTEN for TCP; bound and unconnected for UDP, as ``ss -l``."""
+        if self.proto.startswith('tcp'):
+            return self.state == 'LISTEN'
+        return self.state == 'UNCONN'
+
+
+class UnixSocket(NamedTuple):
+    path: str
+    type: str
+    state: str
+    listening: bool
+    inode: int
+    pid: Optional[int] = None
+
+
+def _read(path: str) -> bytes:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return b''
+    try:
+        chunks = []
+        while True:
+            chunk = os.read(fd, 1 << 16)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+    return b''.join(chunks)
+
+
+_addresses: Dict[bytes, str] = {}
+
+
+def decode_address(hexaddr: bytes) -> str:
+    """Turn ``0100007F`` or a 32-digit IPv6 field into text form.
+
+    The kernel prints each 32-bit word in host (little-endian) byte order.
+    """
+    text = _addresses.get(hexaddr)
+    if text is None:
+        raw = bytes.fromhex(hexaddr.decode())
+        if len(raw) == 4:
+            text = socket.inet_ntop(socket.AF_INET, raw[::-1])
+        else:
+            raw = b''.join(raw[i:i + 4][::-1] for i in range(0, 16, 4))
+            text = socket.inet_ntop(socket.AF_INET6, raw)
+        if len(_addresses) > 4096:
+            _addresses.clear()
+        _addresses[hexaddr] = text
+    return text
+
+
+def read_inet(proto: str = 'tcp', proc: str = PROC) -> List[InetSocket]:
+    """Parse ``/proc/net/<proto>`` (tcp, tcp6, udp, udp6)."""
+    if proto not in INET_PROTOCOLS:
+        raise ValueError('unknown protocol: %r' % proto)
+    tcp = proto.startswith('tcp')
+    sockets = []
+    for line in _read('%s/net/%s' % (proc, proto)).splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < 10:
+            continue
+        local, _, lport = fields[1].partition(b':')
+        remote, _, rport = fields[2].partition(b':')
+        code = int(fields[3], 16)
+        if tcp:
+            state = TCP_STATES.get(code, str(code))
+        else:
+            state = 'UNCONN' if code == _UDP_UNCONNECTED else 'ESTAB'
+        sockets.append(InetSocket(proto, decode_address(local), int(lport, 16),
+                                  decode_address(remote), int(rport, 16),
+                                  state, int(fields[7]), int(fields[9])))
+    return sockets
+
+
+def read_unix(proc: str = PROC) -> List[UnixSocket]:
+    """Parse ``/proc/net/unix``; abstract socket paths start with ``@``."""
+    sockets = []
+    for line in _read('%s/net/unix' % proc).splitlines()[1:]:
+        fields = line.split(None, 7)
+        if len(fields) < 7:
+            continue
+        path = fields[7].decode('utf-8', 'replace') if len(fields) > 7 else ''
+        kind = int(fields[4], 16)
+        sockets.append(UnixSocket(path, UNIX_TYPES.get(kind, str(kind)),
+                                  UNIX_STATES.get(int(fields[5], 16), fields[5].decode()),
+                                  bool(int(fields[3], 16) & _UNIX_ACCEPTCON),
+                                  int(fields[6])))
+    return sockets
+
+
+def _socket_links(pid: int, proc: str) -> Iterable[Tuple[int, int]]:
+    # (inode, fd) for every socket descriptor of one process.
+    fd_dir = '%s/%d/fd' % (proc, pid)
+    try:
+        names = os.listdir(fd_dir)
+    except OSError:
+        return
+    for name in names:
+        try:
+            target = os.readlink('%s/%s' % (fd_dir, name))
+        except OSError:
+            continue
+        if target.startswith('socket:['):
+            yield int(target[8:-1]), int(name)
+
+
+class SocketTable:
+    """Socket records with owning PIDs, cached between refreshes."""
+
+    def __init__(self, proc: str = PROC):
+        self.proc = proc
+        # inode -> (pid, fd) where the socket was last seen.
+        self._owners: Dict[int, Tuple[int, int]] = {}
+        # Inodes of the last table read per kind of query; owners of
+        # inodes in none of them are dropped (the socket is gone).
+        self._tables: Dict[tuple, frozenset] = {}
+        # Inodes no visible process held at the last full scan (other
+        # users' or other namespaces' sockets): don't rescan for them.
+        self._orphans: frozenset = frozenset()
+
+    def _still_owned(self, inode: int) -> Optional[int]:
+        owner = self._owners.get(inode)
+        if owner is None:
+            return None
+        pid, fd = owner
+        try:
+            if os.readlink('%s/%d/fd/%d' % (self.proc, pid, fd)) == \
+                    'socket:[%d]' % inode:
+                return pid
+        except OSError:
+            pass
+        del self._owners[inode]
+        return None
+
+    def owners(self, inodes: Iterable[int]) -> Dict[int, int]:
+        """Map socket inodes to a PID holding them (omitted if none can be
+        seen, e.g. sockets of other users without privileges).
+
+        Cached owners are checked first; /proc is only scanned for the
+        rest, and the scan stops once every inode has been found.  Inodes
+        without a visible owner are remembered and do not trigger scans.
+        """
+        found: Dict[int, int] = {}
+        missing = set()
+        for inode in inodes:
+            if not inode:
+                continue
+            pid = self._still_owned(inode)
+            if pid is None:
+                missing.add(inode)
+            else:
+                found[inode] = pid
+        if missing and not missing <= self._orphans:
+            wanted = frozenset(missing)
+            for name in os.listdir(self.proc):
+                if not name.isdigit():
+                    continue
+                pid = int(name)
+                for inode, fd in _socket_links(pid, self.proc):
+                    if inode in missing:
+                        missing.discard(inode)
+                        found[inode] = pid
+                        self._owners[inode] = (pid, fd)
+                if not missing:
+                    break
+            self._orphans = wanted & missing
+        return found
+
+    def inet(self, protocols: Iterable[str] = INET_PROTOCOLS,
+             pids: bool = True) -> List[InetSocket]:
+        protocols = tuple(protocols)
+        sockets = [s for proto in protocols for s in read_inet(proto, self.proc)]
+        return self._with_pids(('inet',) + protocols, sockets) if pids else sockets
+
+    def unix(self, pids: bool = True) -> List[UnixSocket]:
+        sockets = read_unix(self.proc)
+        return self._with_pids(('unix',), sockets) if pids else sockets
+
+    def listening(self, protocols: Iterable[str] = INET_PROTOCOLS,
+                  pids: bool = True) -> List[InetSocket]:
+        """Listening TCP and bound UDP sockets (``ss -tulnp``)."""
+        protocols = tuple(protocols)
+        sockets = [s for proto in protocols for s in read_inet(proto, self.proc)
+                   if s.listening]
+        return (self._with_pids(('listening',) + protocols, sockets) if pids
+                else sockets)
+
+    def _with_pids(self, kind: tuple, sockets):
+        inodes = frozenset(s.inode for s in sockets)
+        owners = self.owners(inodes)
+        # Forget owners of sockets that no table shows any more, so a
+        # long-running poller doesn't keep every socket it ever saw.
+        self._tables[kind] = inodes
+        live = frozenset().union(*self._tables.values())
+        self._owners = {i: o for i, o in self._owners.items() if i in live}
+        return [s._replace(pid=owners.get(s.inode)) for s in sockets]
+
+
+def listening_ports(protocols: Iterable[str] = INET_PROTOCOLS) -> List[InetSocket]:
+    """One-shot :meth:`SocketTable.listening`."""
+    return SocketTable().listening(protocols)
@@ -0,0 +1,194 @@
+"""Shell-free pipelines: ``echo ... | wc -w`` without ``/bin/sh``.
+
+The walkthrough reaches for ``shell=True`` whenever it needs a pipe, which
+costs an extra shell process per call and invites quoting bugs (the awk
+f-string crash).  :class:`Pipeline` chains argv lists with
+:class:`subprocess.Popen`, each stage's stdout feeding the next stage's
+stdin through an OS pipe::
+
+    from linux_overview.pipeline import Pipeline
+
+    Pipeline(['ls', '/usr/bin'], ['head', '-n', '10']).run(text=True).stdout
+    (Pipeline(['echo', 'How many words?']) | ['wc', '-w']).run().stdout
+
+The data never passes through Python between stages.  The parent closes its
+copies of the inter-stage pipes and children start with ``SIGPIPE`` at its
+default action, so when ``head`` exits the upstream stages die on their next
+write exactly as they would under a shell.
+"""
+
+from __future__ import annotations
+
+import shlex
+import subprocess
+import threading
+from typing import List, NamedTuple, Optional, Sequence, Union
+
+Command = Sequence[str]
+
+
+class PipelineResult(NamedTuple):
+    commands: List[List[str]]
+    returncodes: List[int]
+    stdout: Union[str, bytes, None]
+    # One entry per stage with ``stderr=subprocess.PIPE``, else None.
+    stderr: Optional[List[Union[str, bytes]]] = None
+
+    @property
+    def returncode(self) -> int:
+        """Exit status of the last stage, as ``$?`` in a shell."""
+        return self.returncodes[-1]
+
+    @property
+    def failed(self) -> Optional[int]:
+        """Index of the rightmost stage that failed (``pipefail``), or None.
+
+        Upstream stages killed by ``SIGPIPE`` (-13) are not failures.
+        """
+        for i in range(len(self.returncodes) - 1, -1, -1):
+            code = self.returncodes[i]
+            if code and not (code == -13 and i < len(self.returncodes) - 1):
+                return i
+        return None
+
+
+def _drain(pipe, into: list, index: int) -> None:
+    try:
+        into[index] = pipe.read()
+    finally:
+        pipe.close()
+
+
+def _feed(pipe, data: bytes) -> None:
+    try:
+        pipe.write(data)
+    except BrokenPipeError:
+        pass
+    finally:
+        try:
+            pipe.close()
+        except BrokenPipeError:
+            pass
+
+
+class Pipeline:
+    """An ordered list of commands to connect stdout -> stdin."""
+
+    def __init__(self, *commands: Command):
+        if not commands:
+            raise ValueError('a pipeline needs at least one command')
+        self.commands = [list(c) for c in commands]
+
+    def __or__(self, other: Union['Pipeline', Command]) -> 'Pipeline':
+        tail = other.commands if isinstance(other, Pipeline) else [other]
+        return Pipeline(*self.commands, *tail)
+
+    def __str__(self) -> str:
+        return ' | '.join(shlex.join(c) for c in self.commands)
+
+    def __repr__(self) -> str:
+        return '<Pipeline %s>' % self
+
+    def popen(self, stdin=None, stdout=None, stderr=None,
+              **kwargs) -> List[subprocess.Popen]:
+        """Start every stage and return the processes, first to last.
+
+        ``stdin`` applies to the first stage, ``stdout`` to the last and
+        ``stderr`` to all of them; other keyword arguments (``cwd``,
+        ``env``, ...) go to each :class:`subprocess.Popen`.
+        """
+        procs: List[subprocess.Popen] = []
+        upstream = stdin
+        try:
+            for i, command in enumerate(self.commands):
+                last = i == len(self.commands) - 1
+                proc = subprocess.Popen(
+                    command, stdin=upstream,
+                    stdout=stdout if last else subprocess.PIPE,
+                    stderr=stderr, restore_signals=True, **kwargs)
+                if procs:
+                    # Drop our copy of the read end: only the next stage
+                    # holds it, so its exit delivers SIGPIPE upstream.
+                    procs[-1].stdout.close()
+                procs.append(proc)
+                upstream = proc.stdout
+        except BaseException:
+            for proc in procs:
+                proc.kill()
+                proc.wait()
+            raise
+        return procs
+
+    def run(self, input: Union[str, bytes, None] = None, capture: bool = True,
+            text: bool = False, check: bool = False,
+            timeout: Optional[float] = None, **kwargs) -> PipelineResult:
+        """Run to completion; like ``subprocess.run`` for the whole chain.
+
+        ``input`` is written to the first stage, the last stage's output is
+        returned when ``capture`` is true.  ``check`` raises
+        :class:`subprocess.CalledProcessError` for the stage reported by
+        :attr:`PipelineResult.failed`.  On ``timeout`` every stage is killed
+        and :class:`subprocess.TimeoutExpired` is raised.
+
+        With ``stderr=subprocess.PIPE`` every stage's stderr is read
+        concurrently (so none can block on a full pipe) and returned in
+        :attr:`PipelineResult.stderr`, one entry per stage.
+        """
+        if input is not None:
+            if 'stdin' in kwargs:
+                raise ValueError('stdin and input arguments may not both be used.')
+            kwargs['stdin'] = subprocess.PIPE
+            if isinstance(input, str):
+                input = input.encode()
+        if capture:
+            kwargs['stdout'] = subprocess.PIPE
+        procs = self.popen(**kwargs)
+        first, last = procs[0], procs[-1]
+        threads = []
+        if input is not None:
+            threads.append(threading.Thread(
+                target=_feed, args=(first.stdin, input), daemon=True))
+        errs = None
+        if kwargs.get('stderr') == subprocess.PIPE:
+            # The last stage's stderr is read by communicate().
+            errs = [b''] * len(procs)
+            threads.extend(threading.Thread(target=_drain,
+                                            args=(p.stderr, errs, i), daemon=True)
+                           for i, p in enumerate(procs[:-1]))
+        for thread in threads:
+            thread.start()
+        try:
+            out, errs_last = last.communicate(timeout=timeout)
+            returncodes = [p.wait(timeout) for p in procs]
+        except BaseException:
+            for proc in procs:
+                proc.kill()
+            for proc in procs:
+                proc.wait()
+            for stream in (last.stdout, last.stderr):
+                if stream is not None:
+                    stream.close()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+        if errs is not None:
+            errs[-1] = errs_last
+        if text:
+            if out is not None:
+                out = out.decode(errors='replace')
+            if errs is not None:
+                errs = [e.decode(errors='replace') for e in errs]
+        result = PipelineResult(self.commands, returncodes, out, errs)
+        if check and result.failed is not None:
+            i = result.failed
+            raise subprocess.CalledProcessError(
+                returncodes[i], self.commands[i],
+                out if i == len(procs) - 1 else None,
+                errs[i] if errs is not None else None)
+        return result
+
+
+def pipe(*commands: Command, **kwargs) -> PipelineResult:
+    """Shorthand for ``Pipeline(*commands).run(**kwargs)``."""
+    return Pipeline(*commands).run(**kwargs)
@@ -0,0 +1,204 @@
+"""Concurrent TCP-connect reachability probes instead of ``ping -c 4``.
+
+``ping -c 4 apple.com`` failed because the binary was missing, and ICMP
+needs privileges anyway.  A TCP handshake to a port the host serves answers
+the question that matters (can we reach the service?) without either.
+:func:`probe_many` connects to many ``host:port`` targets at once, at most
+``limit`` in flight, each attempt with its own timeout, and keeps a latency
+histogram per target::
+
+    from linux_overview.probe import run_probes
+
+    for report in run_probes(['apple.com:443', '10.0.0.5:22'], count=4):
+        print(report.target, report.received, '/', report.sent,
+              report.histogram.percentile(50))
+
+Latency is the time from starting the connect (including name resolution)
+to the completed handshake.  The connection is closed immediately.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import time
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+DEFAULT_TIMEOUT = 1.0
+
+# Upper bounds of the histogram buckets, in seconds (last bucket: above).
+BUCKET_BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+Target = Union[str, Tuple[str, int]]
+
+
+class ProbeResult(NamedTuple):
+    host: str
+    port: int
+    ok: bool
+    latency: float
+    error: Optional[str] = None
+
+
+class LatencyHistogram:
+    """Fixed log-spaced buckets; cheap to record into and to merge."""
+
+    __slots__ = ('counts', 'total', 'min', 'max', 'sum')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.total = 0
+        self.min = float('inf')
+        self.max = 0.0
+        self.sum = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.total += other.total
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.total if self.total else None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the ``q``-th percentile,
+        clamped to the observed maximum."""
+        if not self.total:
+            return None
+        rank = max(1, -(-q * self.total // 100))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                bound = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        """``(upper bound, count)`` pairs; the last bound is ``inf``."""
+        return list(zip(BUCKET_BOUNDS + (float('inf'),), self.counts))
+
+    def __repr__(self) -> str:
+        return '<LatencyHistogram n=%d p50=%s max=%s>' % (
+            self.total, self.percentile(50), self.max if self.total else None)
+
+
+class TargetReport(NamedTuple):
+    host: str
+    port: int
+    sent: int
+    received: int
+    histogram: LatencyHistogram
+    errors: Tuple[str, ...]
+
+    @property
+    def target(self) -> str:
+        return '[%s]:%d' % (self.host, self.port) if ':' in self.host \
+            else '%s:%d' % (self.host, self.port)
+
+    @property
+    def reachable(self) -> bool:
+        return self.received > 0
+
+
+def parse_target(target: Target, default_port: Optional[int] = None) -> Tuple[str, int]:
+    """``'host:port'``, ``'[v6]:port'`` or ``(host, port)`` -> ``(host, port)``."""
+    if not isinstance(target, str):
+        host, port = target
+        return host, int(port)
+    if target.startswith('['):
+        host, _, rest = target[1:].partition(']')
+        port = rest[1:] if rest.startswith(':') else ''
+    elif target.count(':') == 1:
+        host, _, port = target.partition(':')
+    else:
+        host, port = target, ''
+    if not port:
+        if default_port is None:
+            raise ValueError('no port in target %r' % target)
+        return host, default_port
+    return host, int(port)
+
+
+async def probe(host: str, port: int,
+                timeout: float = DEFAULT_TIMEOUT) -> ProbeResult:
+    """One TCP connect attempt; never raises for network errors."""
+    loop = asyncio.get_running_loop()
+    started = time.monotonic()
+    try:
+        transport, _ = await asyncio.wait_for(
+            loop.create_connection(asyncio.Protocol, host, port), timeout)
+    except asyncio.TimeoutError:
+        return ProbeResult(host, port, False, time.monotonic() - started,
+                           'timed out after %ss' % timeout)
+    except OSError as e:
+        return ProbeResult(host, port, False, time.monotonic() - started,
+                           e.strerror or str(e))
+    latency = time.monotonic() - started
+    transport.abort()
+    return ProbeResult(host, port, True, latency)
+
+
+async def probe_many(targets: Iterable[Target], count: int = 1,
+                     timeout: float = DEFAULT_TIMEOUT, limit: int = 256,
+                     interval: float = 0.0,
+                     default_port: Optional[int] = None) -> List[TargetReport]:
+    """Probe every target ``count`` times, at most ``limit`` connects at once.
+
+    A target's attempts are ``interval`` seconds apart (like ``ping -i``);
+    different targets run concurrently.  Reports come back in the order of
+    ``targets``.
+    """
+    parsed = [parse_target(t, default_port) for t in targets]
+    semaphore = asyncio.Semaphore(limit)
+
+    async def attempt(host, port):
+        async with semaphore:
+            return await probe(host, port, timeout)
+
+    async def run(host, port):
+        histogram = LatencyHistogram()
+        errors = []
+        for i in range(count):
+            if i and interval:
+                await asyncio.sleep(interval)
+            result = await attempt(host, port)
+            if result.ok:
+                histogram.record(result.latency)
+            else:
+                errors.append(result.error)
+        return TargetReport(host, port, count, histogram.total, histogram,
+                            tuple(errors))
+
+    return list(await asyncio.gather(*(run(h, p) for h, p in parsed)))
+
+
+def run_probes(targets: Iterable[Target], count: int = 1,
+               timeout: float = DEFAULT_TIMEOUT, limit: int = 256,
+               interval: float = 0.0,
+               default_port: Optional[int] = None) -> List[TargetReport]:
+    """Blocking wrapper around :func:`probe_many`."""
+    return asyncio.run(probe_many(targets, count, timeout, limit, interval,
+                                  default_port))
+
+
+def summary(reports: Sequence[TargetReport]) -> LatencyHistogram:
+    """One histogram over the successful attempts of all ``reports``."""
+    total = LatencyHistogram()
+    for report in reports:
+        total.merge(report.histogram)
+    return total
@@ -0,0 +1,291 @@
+"""Continuous ``top``-style process sampling with a fixed-size history.
+
+``top -b -n 1 | head -n 12`` gives one text snapshot.  :class:`ProcessSampler`
+reads ``/proc/[pid]/stat`` at a fixed interval, turns utime+stime tick deltas
+into CPU percentages and appends one row per process to a ring buffer made of
+``array`` columns, so memory stays fixed however long it runs::
+
+    from linux_overview.procsample import ProcessSampler
+
+    with ProcessSampler(interval=1.0) as sampler:
+        time.sleep(10)
+        sampler.top(5, by='cpu', window=10)
+
+``/proc/[pid]/status`` is only read the first time a process is seen, for its
+owner uid.  Stat files are kept open between samples and re-read with
+``pread(2)``, so the per-interval cost is a single system call per PID.
+"""
+
+from __future__ import annotations
+
+import array
+import os
+import resource
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+PROC = '/proc'
+
+CLK_TCK = os.sysconf('SC_CLK_TCK')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+
+class ProcStat(NamedTuple):
+    pid: int
+    name: str
+    state: str
+    ticks: int
+    starttime: int
+    rss: int
+
+
+class TopEntry(NamedTuple):
+    pid: int
+    name: str
+    uid: Optional[int]
+    cpu: float
+    rss: int
+    samples: int
+
+
+def _read(path: str) -> Optional[bytes]:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, 4096)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def read_stat(pid: int, proc: str = PROC) -> Optional[ProcStat]:
+    """Parse ``/proc/<pid>/stat``; ``None`` if the process is gone."""
+    data = _read('%s/%d/stat' % (proc, pid))
+    if not data:
+        return None
+    # comm is parenthesised and may itself contain spaces and parens.
+    head, _, rest = data.rpartition(b')')
+    fields = rest.split()
+    if len(fields) < 22:
+        return None
+    name = head.partition(b'(')[2].decode('utf-8', 'replace')
+    return ProcStat(pid, name, fields[0].decode(),
+                    int(fields[11]) + int(fields[12]), int(fields[19]),
+                    int(fields[21]) * PAGE_SIZE)
+
+
+def read_uid(pid: int, proc: str = PROC) -> Optional[int]:
+    """Real uid from ``/proc/<pid>/status``."""
+    data = _read('%s/%d/status' % (proc, pid))
+    if data:
+        start = data.find(b'\nUid:')
+        if start >= 0:
+            return int(data[start + 5:].split(None, 1)[0])
+    return None
+
+
+def list_pids(proc: str = PROC) -> List[int]:
+    return [int(name) for name in os.listdir(proc) if name.isdigit()]
+
+
+class ProcessSampler:
+    """Samples every process into a ring buffer of ``capacity`` rows.
+
+    Up to ``max_fds`` stat files stay open between samples; :meth:`stop`
+    (or leaving the ``with`` block) closes them.
+    """
+
+    def __init__(self, interval: float = 1.0, capacity: int = 1 << 18,
+                 proc: str = PROC, max_fds: Optional[int] = None):
+        if max_fds is None:
+            soft = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+            max_fds = 4096 if soft == resource.RLIM_INFINITY else soft // 2
+        self.max_fds = max_fds
+        self.interval = interval
+        self.capacity = capacity
+        self.proc = proc
+        self._time = array.array('d', [0.0]) * capacity
+        self._pid = array.array('i', [0]) * capacity
+        self._cpu = array.array('f', [0.0]) * capacity
+        self._rss = array.array('q', [0]) * capacity
+        self._next = 0
+        self._size = 0
+        # pid -> (starttime, ticks, wall time) of the previous sample
+        self._prev: Dict[int, Tuple[int, int, float]] = {}
+        # pid -> (starttime, name, uid, last seen)
+        self._meta: Dict[int, Tuple[int, str, Optional[int], float]] = {}
+        # pid -> open fd of /proc/<pid>/stat, re-read with pread() each
+        # interval; saves an open()/close() pair per process and sample.
+        self._fds: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def sample(self) -> int:
+        """Take one sample of all processes; return the rows recorded.
+
+        A process contributes a row from its second sample on, once a
+        tick delta is available.
+        """
+        now = time.monotonic()
+        prev, meta = self._prev, self._meta
+        current = {}
+        rows = []
+        # Hot loop: one pread(2) per PID on a cached stat fd and the minimum
+        # of parsing; names and uids are only decoded for new PIDs.
+        fds = self._fds
+        procfd = os.open(self.proc, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            for name in os.listdir(procfd):
+                if not name.isdigit():
+                    continue
+                pid = int(name)
+                data = None
+                fd = fds.get(pid)
+                if fd is not None:
+                    try:
+                        data = os.pread(fd, 4096, 0)
+                    except OSError:
+                        pass
+                    if not data:
+                        # The process behind the cached fd exited; the PID
+                        # may already belong to a new one.
+                        del fds[pid]
+                        os.close(fd)
+                if not data:
+                    try:
+                        fd = os.open(name + '/stat', os.O_RDONLY, dir_fd=procfd)
+                    except OSError:
+                        continue
+                    try:
+                        data = os.read(fd, 4096)
+                    except OSError:
+                        data = None
+                    if data and len(fds) < self.max_fds:
+                        fds[pid] = fd
+                    else:
+                        os.close(fd)
+                    if not data:
+                        continue
+                fields = data[data.rindex(b')') + 2:].split(None, 22)
+                if len(fields) < 22:
+                    continue
+                ticks = int(fields[11]) + int(fields[12])
+                starttime = int(fields[19])
+                current[pid] = (starttime, ticks, now)
+                known = meta.get(pid)
+                if known is None or known[0] != starttime:
+                    st = read_stat(pid, self.proc)
+                    meta[pid] = (starttime, st.name if st else '',
+                                 read_uid(pid, self.proc), now)
+                else:
+                    meta[pid] = known[:3] + (now,)
+                last = prev.get(pid)
+                if last is None or last[0] != starttime:
+                    continue
+                elapsed = now - last[2]
+                if elapsed > 0:
+                    rows.append((pid, 100.0 * (ticks - last[1]) / CLK_TCK / elapsed,
+                                 int(fields[21]) * PAGE_SIZE))
+        finally:
+            os.close(procfd)
+        self._prev = current
+        with self._lock:
+            t, p, c, r = self._time, self._pid, self._cpu, self._rss
+            i, cap = self._next, self.capacity
+            for pid, cpu, rss in rows:
+                t[i], p[i], c[i], r[i] = now, pid, cpu, rss
+                i = i + 1 if i + 1 < cap else 0
+            self._next = i
+            self._size = min(cap, self._size + len(rows))
+            oldest = t[(i - self._size) % cap] if self._size else now
+        # Keep names of exited processes while they still have rows.
+        for pid in [p for p, m in meta.items() if m[3] < oldest]:
+            del meta[pid]
+        for pid in [p for p in fds if p not in current]:
+            os.close(fds.pop(pid))
+        return len(rows)
+
+    def top(self, n: int = 10, by: str = 'cpu',
+            window: Optional[float] = None) -> List[TopEntry]:
+        """Top ``n`` processes over the last ``window`` seconds.
+
+        ``by='cpu'`` ranks by mean CPU percentage over the window,
+        ``by='rss'`` by peak resident set size.  ``window=None`` covers the
+        whole history.
+        """
+        if by not in ('cpu', 'rss'):
+            raise ValueError("by must be 'cpu' or 'rss'")
+        since = time.monotonic() - window if window is not None else float('-inf')
+        totals: Dict[int, list] = {}
+        with self._lock:
+            cap, size = self.capacity, self._size
+            start = (self._next - size) % cap
+            t, p, c, r = self._time, self._pid, self._cpu, self._rss
+            lo = _first_at_or_after(t, start, size, cap, since)
+            for k in range(lo, size):
+                i = (start + k) % cap
+                agg = totals.get(p[i])
+                if agg is None:
+                    totals[p[i]] = [c[i], r[i], 1]
+                else:
+                    agg[0] += c[i]
+                    if r[i] > agg[1]:
+                        agg[1] = r[i]
+                    agg[2] += 1
+        entries = []
+        for pid, (cpu, rss, count) in totals.items():
+            name, uid = self._meta.get(pid, (0, '', None, 0.0))[1:3]
+            entries.append(TopEntry(pid, name, uid, cpu / count, rss, count))
+        key = (lambda e: e.cpu) if by == 'cpu' else (lambda e: e.rss)
+        entries.sort(key=key, reverse=True)
+        return entries[:n]
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.sample()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def start(self) -> 'ProcessSampler':
+        """Sample every ``interval`` seconds on a daemon thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the sampling thread and close the cached stat fds."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        while self._fds:
+            os.close(self._fds.popitem()[1])
+
+    def __enter__(self) -> 'ProcessSampler':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def _first_at_or_after(times, start: int, size: int, cap: int,
+                       since: float) -> int:
+    """Binary search over the ring's logical order for ``times >= since``."""
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if times[(start + mid) % cap] < since:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
@@ -0,0 +1,138 @@
+"""Copy a child's stdout to a file or socket without touching the bytes.
+
+Capturing ``find /`` or ``ls -l /usr/bin`` only to write it somewhere else
+decodes, re-encodes and copies every byte through Python objects.
+:func:`copy_fd` moves data between descriptors inside the kernel with
+:func:`os.splice` (when either side is a pipe) or :func:`os.sendfile` (when
+the source is a regular file), and falls back to a loop over one reusable
+buffer; :func:`run_to` pumps a command's stdout through it::
+
+    from linux_overview.redirect import run_to
+
+    with open('/tmp/usr-bin.txt', 'wb') as f:
+        run_to(['ls', '-l', '/usr/bin'], f).bytes
+
+If nothing needs to see the stream (not even a byte count), passing the
+destination file as ``stdout=`` to :class:`subprocess.Popen` is cheaper
+still: the child then writes to it directly.
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import stat
+import subprocess
+import threading
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+CHUNK_SIZE = 1 << 20
+BUFFER_SIZE = 1 << 16
+
+_local = threading.local()
+
+# Errors meaning "this kernel path does not apply to these descriptors".
+_UNSUPPORTED = (errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ESPIPE)
+
+
+class RedirectResult(NamedTuple):
+    args: Sequence[str]
+    returncode: int
+    bytes: int
+
+
+def _fileno(target) -> int:
+    return target if isinstance(target, int) else target.fileno()
+
+
+def _buffer() -> memoryview:
+    view = getattr(_local, 'view', None)
+    if view is None:
+        view = _local.view = memoryview(bytearray(BUFFER_SIZE))
+    return view
+
+
+def _copy_kernel(src: int, dst: int, limit: Optional[int],
+                 splice: bool) -> Tuple[int, bool]:
+    # Returns (bytes copied, finished); not finished means the kernel
+    # refused these descriptors and the caller should continue buffered.
+    total = 0
+    while limit is None or total < limit:
+        count = CHUNK_SIZE if limit is None else min(CHUNK_SIZE, limit - total)
+        try:
+            if splice:
+                n = os.splice(src, dst, count)
+            else:
+                # offset=None uses and advances the source file position.
+                n = os.sendfile(dst, src, None, count)
+        except OSError as e:
+            if e.errno in _UNSUPPORTED:
+                return total, False
+            raise
+        if not n:
+            break
+        total += n
+    return total, True
+
+
+def _copy_buffer(src: int, dst: int, limit: Optional[int]) -> int:
+    view = _buffer()
+    total = 0
+    while limit is None or total < limit:
+        chunk = view if limit is None else view[:min(len(view), limit - total)]
+        n = os.readv(src, [chunk])
+        if not n:
+            break
+        data = chunk[:n]
+        while data:
+            data = data[os.write(dst, data):]
+        total += n
+    return total
+
+
+def copy_fd(src, dst, limit: Optional[int] = None) -> int:
+    """Copy from ``src`` to ``dst`` until EOF (or ``limit`` bytes).
+
+    Both arguments are descriptors or objects with ``fileno()``; any Python
+    level buffering on them is bypassed, so flush a file object first.
+    Returns the number of bytes copied.
+    """
+    src, dst = _fileno(src), _fileno(dst)
+    src_mode = os.fstat(src).st_mode
+    total = 0
+    if hasattr(os, 'splice') and (stat.S_ISFIFO(src_mode)
+                                  or stat.S_ISFIFO(os.fstat(dst).st_mode)):
+        total, finished = _copy_kernel(src, dst, limit, splice=True)
+    elif hasattr(os, 'sendfile') and stat.S_ISREG(src_mode):
+        total, finished = _copy_kernel(src, dst, limit, splice=False)
+    else:
+        finished = False
+    if finished:
+        return total
+    return total + _copy_buffer(src, dst,
+                                None if limit is None else limit - total)
+
+
+def run_to(args: Sequence[str], dest, limit: Optional[int] = None,
+           **popen_kwargs) -> RedirectResult:
+    """Run ``args`` and copy its stdout to ``dest`` (fd, file or socket).
+
+    With ``limit`` the copy stops after that many bytes and the child is
+    terminated.  Extra keyword arguments go to :class:`subprocess.Popen`.
+    """
+    if popen_kwargs.get('stdout') is not None:
+        raise ValueError('stdout is always copied to dest')
+    if hasattr(dest, 'flush'):
+        dest.flush()
+    proc = subprocess.Popen(args, stdout=subprocess.PIPE, **popen_kwargs)
+    try:
+        copied = copy_fd(proc.stdout, dest, limit)
+        if limit is not None and copied >= limit and proc.poll() is None:
+            proc.terminate()
+    except BaseException:
+        proc.kill()
+        raise
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+    return RedirectResult(args, returncode, copied)
@@ -0,0 +1,254 @@
+"""Which container runtime (if any) this process runs under.
+
+The walkthrough looked for ``/.dockerenv`` / ``.dockerinit`` and searched
+``/var/lib/docker``, and both came back empty while the environment was full
+of ``KUBERNETES_*`` variables.  :func:`detect` weighs several independent
+markers instead: ``/proc/1/cgroup`` paths, the root mount in
+``/proc/self/mountinfo``, the PID shown by ``/proc/1/sched``, marker files
+and environment variables::
+
+    from linux_overview.runtime import detect
+
+    rt = detect()
+    rt.kind            # 'docker', 'containerd', 'podman', 'lxc', 'gvisor',
+                       # 'container' (unknown engine) or 'bare-metal'
+    rt.kubernetes      # running in a Kubernetes pod
+    rt.evidence        # which markers decided it
+
+The answer cannot change without a reboot or a move to another mount
+namespace, so it is cached on disk keyed by
+``/proc/sys/kernel/random/boot_id`` plus the mount namespace, and kept
+in-process after the first call, which makes :func:`detect` a global lookup
+on hot paths.  ``bare-metal`` means "not in a container": a virtual machine
+also reports it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+BOOT_ID = '/proc/sys/kernel/random/boot_id'
+CGROUP = '/proc/1/cgroup'
+SCHED = '/proc/1/sched'
+MOUNTINFO = '/proc/self/mountinfo'
+PROC_VERSION = '/proc/version'
+
+CACHE_FILE = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+    'linux_overview', 'runtime.json')
+
+# Substrings of cgroup paths and of the root mount's source and options,
+# most specific first.
+_ENGINE_MARKERS = (
+    ('cri-containerd', 'containerd'),
+    ('/run/containerd/', 'containerd'),
+    ('io.containerd', 'containerd'),
+    ('libpod', 'podman'),
+    ('/var/lib/containers/', 'podman'),
+    ('/docker/', 'docker'),
+    ('docker-', 'docker'),
+    ('/var/lib/docker/', 'docker'),
+    ('/lxc/', 'lxc'),
+    ('lxc.payload', 'lxc'),
+)
+_KUBERNETES_CGROUP = 'kubepods'
+# Mounted into every pod (service account token); on a node these paths
+# only appear below /var/lib/kubelet.
+_KUBERNETES_MOUNTS = ('/run/secrets/kubernetes.io',
+                      '/var/run/secrets/kubernetes.io')
+# gVisor's Sentry reports a fixed fake kernel build.
+_GVISOR_VERSION = '#1 SMP Sun Jan 10 15:06:54 PST 2016'
+_CONTAINER_ID = re.compile(r'[0-9a-f]{64}')
+# Engines bind-mount these per-container files from a directory named by
+# the container id (the root overlay is named by a layer id instead).
+_ENGINE_FILES = ('/etc/hostname', '/etc/hosts', '/etc/resolv.conf')
+_ID_DIRECTORY = re.compile(r'/(?:containers|overlay-containers)/([0-9a-f]{64})/')
+
+# Result for this process once detect() has run.
+_current: Optional['Runtime'] = None
+
+
+class Runtime(NamedTuple):
+    kind: str
+    kubernetes: bool
+    container_id: Optional[str]
+    evidence: Tuple[str, ...]
+
+    @property
+    def containerized(self) -> bool:
+        return self.kind != 'bare-metal'
+
+
+def _read(path: str) -> str:
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return f.read()
+    except OSError:
+        return ''
+
+
+def cache_key() -> str:
+    """``boot_id:mount namespace``; containers share the host's boot_id."""
+    try:
+        mntns = os.readlink('/proc/self/ns/mnt')
+    except OSError:
+        mntns = ''
+    return '%s:%s' % (_read(BOOT_ID).strip(), mntns)
+
+
+def _sched_pid(text: str) -> Optional[int]:
+    # First line: "systemd (1, #threads: 1)"; older kernels print the
+    # host PID here, so anything but 1 means a PID namespace.
+    m = re.search(r'\((\d+), #threads', text.partition('\n')[0])
+    return int(m.group(1)) if m else None
+
+
+def _mounts(mountinfo: str) -> List[Tuple[str, str, str]]:
+    """``(root, mount point, source and options)`` per mountinfo line."""
+    # "id parent maj:min root mountpoint options [tags...] - fstype source
+    # superoptions"
+    mounts = []
+    for line in mountinfo.splitlines():
+        head, sep, tail = line.partition(' - ')
+        fields = head.split()
+        if not sep or len(fields) < 6:
+            continue
+        mounts.append((fields[3], fields[4],
+                       ' '.join([fields[5]] + tail.split()[1:])))
+    return mounts
+
+
+def _classify(cgroup: str, mountinfo: str, sched: str, version: str,
+              environ, exists) -> Runtime:
+    evidence: List[str] = []
+    kind = None
+    container_id = None
+
+    if _GVISOR_VERSION in version:
+        kind = 'gvisor'
+        evidence.append('proc-version:gvisor')
+
+    # Only the root filesystem says where *this* process lives: a host
+    # running containers has their overlays and netns mounts elsewhere in
+    # its mountinfo.  The last mount on / is the visible one.
+    mounts = _mounts(mountinfo)
+    root = [desc for _, point, desc in mounts if point == '/'][-1:]
+    for source, text in (('cgroup', cgroup), ('mountinfo', ''.join(root))):
+        for marker, engine in _ENGINE_MARKERS:
+            if marker in text:
+                # gVisor runs under docker/containerd too; keep it as kind.
+                kind = kind or engine
+                evidence.append('%s:%s' % (source, marker.strip('/')))
+                break
+
+    m = _CONTAINER_ID.search(cgroup)
+    if m:
+        container_id = m.group(0)
+    else:
+        for mount_root, point, _ in mounts:
+            m = _ID_DIRECTORY.search(mount_root) if point in _ENGINE_FILES else None
+            if m:
+                container_id = m.group(1)
+                break
+
+    if kind is None:
+        if exists('/.dockerenv'):
+            kind = 'docker'
+            evidence.append('file:/.dockerenv')
+        elif exists('/run/.containerenv'):
+            kind = 'podman'
+            evidence.append('file:/run/.containerenv')
+        elif environ.get('container'):
+            kind = environ['container'] if environ['container'] in (
+                'docker', 'podman', 'lxc') else 'container'
+            evidence.append('env:container=%s' % environ['container'])
+
+    kubernetes = False
+    if environ.get('KUBERNETES_SERVICE_HOST'):
+        kubernetes = True
+        evidence.append('env:KUBERNETES_SERVICE_HOST')
+    if _KUBERNETES_CGROUP in cgroup:
+        kubernetes = True
+        evidence.append('cgroup:%s' % _KUBERNETES_CGROUP)
+    else:
+        for _, point, _ in mounts:
+            if point.startswith(_KUBERNETES_MOUNTS):
+                kubernetes = True
+                evidence.append('mountinfo:%s' % point)
+                break
+
+    if kind is None:
+        pid = _sched_pid(sched)
+        if pid is not None and pid != 1:
+            kind = 'container'
+            evidence.append('sched:pid1=%d' % pid)
+        elif kubernetes:
+            kind = 'container'
+    return Runtime(kind or 'bare-metal', kubernetes, container_id,
+                   tuple(evidence))
+
+
+def probe() -> Runtime:
+    """Classify from scratch, without any caching."""
+    return _classify(_read(CGROUP), _read(MOUNTINFO), _read(SCHED),
+                     _read(PROC_VERSION), os.environ, os.path.exists)
+
+
+def _load(path: str, key: str) -> Optional[Runtime]:
+    try:
+        with open(path) as f:
+            entry = json.load(f).get(key)
+        if entry is None:
+            return None
+        return Runtime(entry['kind'], entry['kubernetes'],
+                       entry['container_id'], tuple(entry['evidence']))
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _store(path: str, key: str, runtime: Runtime) -> None:
+    # Entries for other boots are dropped; other namespaces of this boot
+    # (host and containers sharing a home directory) are kept.
+    boot = key.partition(':')[0]
+    try:
+        with open(path) as f:
+            entries = {k: v for k, v in json.load(f).items()
+                       if k.partition(':')[0] == boot}
+    except (OSError, ValueError, AttributeError):
+        entries = {}
+    entries[key] = runtime._asdict()
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, 'w') as f:
+            json.dump(entries, f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def detect(refresh: bool = False, cache_file: Optional[str] = CACHE_FILE) -> Runtime:
+    """The runtime of this process, computed once per boot and namespace.
+
+    ``cache_file=None`` disables the on-disk cache; ``refresh`` ignores both
+    caches and re-classifies (call it after ``setns(2)``).
+    """
+    global _current
+    if not refresh and _current is not None:
+        return _current
+    key = cache_key()
+    runtime = None
+    if not refresh and cache_file is not None:
+        runtime = _load(cache_file, key)
+    if runtime is None:
+        runtime = probe()
+        if cache_file is not None:
+            _store(cache_file, key, runtime)
+    _current = runtime
+    return runtime
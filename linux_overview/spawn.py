@@ -0,0 +1,237 @@
+"""``posix_spawn`` launcher for high-rate short commands.
+
+Plain ``fork()`` copies the parent's page tables, so from a Python worker
+with tens of GB resident every ``whoami`` or ``uname`` pays for the size of
+the parent.  :func:`run` starts the child with :func:`os.posix_spawn`
+instead (glibc implements it with ``clone(CLONE_VM | CLONE_VFORK)``, so no
+page tables are copied) and falls back to :func:`subprocess.run` for options
+posix_spawn cannot express::
+
+    from linux_overview.spawn import run
+
+    run(['whoami'], capture_output=True, text=True).stdout
+
+CPython 3.10+ already uses ``vfork`` inside ``subprocess`` when it can; this
+module makes the cheap path explicit and predictable, including on older
+interpreters.  See ``benchmarks/bench_spawn.py`` for latency against parent
+RSS.
+
+Like ``subprocess`` with ``close_fds=True``, the child only inherits its
+stdio: every other descriptor Python creates is close-on-exec (PEP 446).
+"""
+
+from __future__ import annotations
+
+import locale
+import os
+import selectors
+import shutil
+import signal
+import subprocess
+import time
+from typing import Optional, Sequence
+
+# Keyword arguments posix_spawn can honour; anything else (cwd,
+# preexec_fn, pass_fds, user/group changes, ...) takes the fallback.
+_SUPPORTED = frozenset(['stdin', 'stdout', 'stderr', 'input', 'capture_output',
+                        'timeout', 'check', 'env', 'text', 'encoding',
+                        'errors', 'universal_newlines', 'start_new_session',
+                        'close_fds'])
+
+# subprocess restores these to SIG_DFL in the child (restore_signals=True).
+_RESTORE_SIGNALS = tuple(getattr(signal, name)
+                         for name in ('SIGPIPE', 'SIGXFSZ')
+                         if hasattr(signal, name))
+
+
+def can_spawn(**kwargs) -> bool:
+    """Whether :func:`run` would use ``posix_spawn`` for these options."""
+    if not hasattr(os, 'posix_spawn'):
+        return False
+    if not _SUPPORTED.issuperset(kwargs) or kwargs.get('close_fds') is False:
+        return False
+    for name in ('stdin', 'stdout', 'stderr'):
+        value = kwargs.get(name)
+        if value not in (None, subprocess.PIPE, subprocess.DEVNULL) and \
+                not isinstance(value, int) and not hasattr(value, 'fileno'):
+            return False
+    return True
+
+
+def _resolve(executable: str, env) -> str:
+    if os.sep in executable:
+        return executable
+    path = (env if env is not None else os.environ).get('PATH', os.defpath)
+    found = shutil.which(executable, path=path)
+    if found is None:
+        raise FileNotFoundError(2, 'No such file or directory', executable)
+    return found
+
+
+def _communicate(stdin_w, stdout_r, stderr_r, input: Optional[bytes],
+                 deadline: Optional[float]):
+    chunks = {stdout_r: [], stderr_r: []}
+    view = memoryview(input or b'')
+    sel = selectors.DefaultSelector()
+    try:
+        if stdin_w is not None:
+            if view:
+                sel.register(stdin_w, selectors.EVENT_WRITE)
+            else:
+                os.close(stdin_w)
+                stdin_w = None
+        for fd in (stdout_r, stderr_r):
+            if fd is not None:
+                sel.register(fd, selectors.EVENT_READ)
+        while sel.get_map():
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    raise subprocess.TimeoutExpired(None, None)
+            for key, _ in sel.select(timeout):
+                fd = key.fd
+                if fd == stdin_w:
+                    try:
+                        sent = os.write(fd, view[:65536])
+                    except BrokenPipeError:
+                        sent = len(view)
+                    view = view[sent:]
+                    if not view:
+                        sel.unregister(fd)
+                        os.close(fd)
+                        stdin_w = None
+                    continue
+                data = os.read(fd, 65536)
+                if data:
+                    chunks[fd].append(data)
+                else:
+                    sel.unregister(fd)
+    finally:
+        sel.close()
+        if stdin_w is not None:
+            os.close(stdin_w)
+    return (b''.join(chunks[stdout_r]) if stdout_r is not None else None,
+            b''.join(chunks[stderr_r]) if stderr_r is not None else None)
+
+
+def _wait(pid: int, deadline: Optional[float]) -> int:
+    while True:
+        if deadline is None:
+            _, status = os.waitpid(pid, 0)
+        else:
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if not done:
+                if time.monotonic() >= deadline:
+                    raise subprocess.TimeoutExpired(None, None)
+                time.sleep(0.001)
+                continue
+        if os.WIFSIGNALED(status):
+            return -os.WTERMSIG(status)
+        return os.WEXITSTATUS(status)
+
+
+def _kill(pid: int) -> None:
+    try:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+    except (ProcessLookupError, ChildProcessError):
+        pass
+
+
+def _decode(data: Optional[bytes], encoding: str, errors: str) -> Optional[str]:
+    # Universal newlines, as subprocess does in text mode.
+    if data is None:
+        return None
+    text = data.decode(encoding, errors)
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _target(value, fd: int, actions: list, close_after: list, pipe_ends: dict):
+    if value is None:
+        return
+    if value == subprocess.PIPE:
+        r, w = os.pipe()
+        child, parent = (r, w) if fd == 0 else (w, r)
+        actions.append((os.POSIX_SPAWN_DUP2, child, fd))
+        close_after.append(child)
+        pipe_ends[fd] = parent
+    elif value == subprocess.DEVNULL:
+        actions.append((os.POSIX_SPAWN_OPEN, fd, os.devnull,
+                        os.O_RDONLY if fd == 0 else os.O_WRONLY, 0))
+    elif value == subprocess.STDOUT:
+        actions.append((os.POSIX_SPAWN_DUP2, 1, 2))
+    else:
+        source = value if isinstance(value, int) else value.fileno()
+        actions.append((os.POSIX_SPAWN_DUP2, source, fd))
+
+
+def run(args: Sequence[str], **kwargs) -> subprocess.CompletedProcess:
+    """Drop-in for :func:`subprocess.run` that prefers ``posix_spawn``."""
+    if not can_spawn(**kwargs):
+        return subprocess.run(args, **kwargs)
+    # A single program name or path, as subprocess accepts without a shell.
+    argv = [os.fsdecode(a) for a in (
+        [args] if isinstance(args, (str, bytes, os.PathLike)) else args)]
+    input = kwargs.get('input')
+    timeout = kwargs.get('timeout')
+    env = kwargs.get('env')
+    text = bool(kwargs.get('text') or kwargs.get('universal_newlines')
+                or kwargs.get('encoding') or kwargs.get('errors'))
+    stdin, stdout, stderr = (kwargs.get(name)
+                             for name in ('stdin', 'stdout', 'stderr'))
+    if kwargs.get('capture_output'):
+        if stdout is not None or stderr is not None:
+            raise ValueError('stdout and stderr arguments may not be used '
+                             'with capture_output.')
+        stdout = stderr = subprocess.PIPE
+    if input is not None:
+        if stdin is not None:
+            raise ValueError('stdin and input arguments may not both be used.')
+        stdin = subprocess.PIPE
+        if text:
+            input = input.encode(
+                kwargs.get('encoding') or locale.getpreferredencoding(False),
+                kwargs.get('errors') or 'strict')
+
+    actions: list = []
+    close_after: list = []
+    pipes: dict = {}
+    try:
+        for value, fd in ((stdin, 0), (stdout, 1), (stderr, 2)):
+            _target(value, fd, actions, close_after, pipes)
+        pid = os.posix_spawn(_resolve(argv[0], env), argv,
+                             os.environ if env is None else env,
+                             file_actions=actions,
+                             setsigdef=_RESTORE_SIGNALS,
+                             setsid=bool(kwargs.get('start_new_session')))
+    except BaseException:
+        for fd in close_after + list(pipes.values()):
+            os.close(fd)
+        raise
+    for fd in close_after:
+        os.close(fd)
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        out, err = _communicate(pipes.get(0), pipes.get(1), pipes.get(2),
+                                input, deadline)
+        returncode = _wait(pid, deadline)
+    except BaseException as e:
+        # Timeout, KeyboardInterrupt or a failed read: as subprocess.run,
+        # don't leave the child running or unreaped.
+        _kill(pid)
+        if isinstance(e, subprocess.TimeoutExpired):
+            raise subprocess.TimeoutExpired(args, timeout) from None
+        raise
+    finally:
+        for fd in (pipes.get(1), pipes.get(2)):
+            if fd is not None:
+                os.close(fd)
+    if text:
+        encoding = kwargs.get('encoding') or locale.getpreferredencoding(False)
+        errors = kwargs.get('errors') or 'strict'
+        out, err = (_decode(data, encoding, errors) for data in (out, err))
+    if kwargs.get('check') and returncode:
+        raise subprocess.CalledProcessError(returncode, args, out, err)
+    return subprocess.CompletedProcess(args, returncode, out, err)
@@ -0,0 +1,157 @@
+"""Bounded-memory line streaming for commands whose output gets sliced.
+
+``subprocess.run(..., capture_output=True, text=True).stdout.splitlines()[:50]``
+decodes the child's entire output before throwing most of it away.
+:func:`stream_lines` reads stdout one line at a time and stops the child as
+soon as the caller has what it asked for::
+
+    from linux_overview.stream import run_lines, stream_lines
+
+    for line in stream_lines(['find', '/', '-name', '*.py'], head=50):
+        print(line)
+
+    run_lines(['ls', '-l', '/usr/bin'], tail=5).lines
+
+Peak memory is one line plus ``tail`` lines, however much the command prints.
+
+With a :class:`~linux_overview.cancel.CancelToken` (or ``timeout``) the
+command runs in its own session; when the token fires the whole process
+group is killed and the lines read so far are returned as a truncated
+result instead of being lost to a KeyboardInterrupt.
+"""
+
+from __future__ import annotations
+
+import collections
+import subprocess
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Union
+
+from .cancel import CancelToken, killpg
+
+Line = Union[str, bytes]
+
+TERMINATE_GRACE = 1.0
+
+
+class StreamResult(NamedTuple):
+    args: Sequence[str]
+    lines: List[Line]
+    returncode: int
+    truncated: bool
+
+
+def _stop(proc: subprocess.Popen) -> None:
+    if proc.poll() is None:
+        proc.terminate()
+        try:
+            proc.wait(TERMINATE_GRACE)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+class _LineStream:
+    """Iterator over a child's stdout lines that remembers how it ended."""
+
+    def __init__(self, args, head=None, tail=None, text=True,
+                 cancel: Optional[CancelToken] = None, **kwargs):
+        if head is not None and head < 0 or tail is not None and tail < 0:
+            raise ValueError('head and tail must be non-negative')
+        if kwargs.get('stdout') is not None or kwargs.get('stderr') == subprocess.PIPE:
+            raise ValueError('stdout is always streamed and stderr may not be '
+                             'a pipe; redirect stderr to a file or DEVNULL')
+        self.args = args
+        self.head = head
+        self.tail = tail
+        self.text = text
+        self.cancel = cancel
+        if cancel is not None:
+            kwargs.setdefault('start_new_session', True)
+        self.kwargs = kwargs
+        self.returncode: Optional[int] = None
+        self.truncated = False
+
+    def __iter__(self) -> Iterator[Line]:
+        head, tail = self.head, self.tail
+        newline = '\n' if self.text else b'\n'
+        ring = collections.deque(maxlen=tail) if tail is not None else None
+        proc = subprocess.Popen(self.args, stdout=subprocess.PIPE,
+                                text=self.text, **self.kwargs)
+        finished = False
+        unregister = None
+        if self.cancel is not None:
+            # Killing the group closes the pipe, so a blocked read sees EOF.
+            unregister = self.cancel.on_cancel(lambda: killpg(proc.pid))
+        try:
+            count = 0
+            if head != 0:
+                for line in proc.stdout:
+                    if line.endswith(newline):
+                        line = line[:-1]
+                    if ring is None:
+                        yield line
+                    else:
+                        ring.append(line)
+                    count += 1
+                    if head is not None and count >= head:
+                        break
+                else:
+                    finished = True
+        finally:
+            if unregister is not None:
+                unregister()
+                if self.cancel.cancelled:
+                    self.truncated = True
+            # Not finished means the head limit was hit or the consumer
+            # closed the generator: stop the child instead of draining it.
+            # Whether it had already exited is a race, so it doesn't decide
+            # truncated.
+            if not finished:
+                self.truncated = True
+                _stop(proc)
+            proc.stdout.close()
+            self.returncode = proc.wait()
+        if ring is not None:
+            yield from ring
+
+
+def stream_lines(args: Sequence[str], head: Optional[int] = None,
+                 tail: Optional[int] = None, text: bool = True,
+                 cancel: Optional[CancelToken] = None,
+                 **popen_kwargs) -> Iterator[Line]:
+    """Yield the lines ``args`` writes to stdout, without line endings.
+
+    ``head`` stops after that many lines and terminates the child; ``tail``
+    keeps only the last lines (of the first ``head`` if both are given).
+    With ``text=False`` lines are ``bytes``.  When ``cancel`` fires the
+    child's process group is killed and the iteration ends.  Extra keyword
+    arguments go to :class:`subprocess.Popen`; stderr is inherited unless
+    redirected.
+    """
+    return iter(_LineStream(args, head, tail, text, cancel, **popen_kwargs))
+
+
+def run_lines(args: Sequence[str], head: Optional[int] = None,
+              tail: Optional[int] = None, text: bool = True,
+              check: bool = False, cancel: Optional[CancelToken] = None,
+              timeout: Optional[float] = None,
+              **popen_kwargs) -> StreamResult:
+    """Collect :func:`stream_lines` into a :class:`StreamResult`.
+
+    ``truncated`` is true when reading stopped early because of ``head``
+    (even if the child had nothing more to print), ``cancel`` or
+    ``timeout``; the lines read until then are kept.
+    ``check`` raises :class:`subprocess.CalledProcessError` for a non-zero
+    exit status of a child that was allowed to finish.
+    """
+    token = None
+    if timeout is not None:
+        cancel = token = CancelToken(timeout, parent=cancel)
+    try:
+        stream = _LineStream(args, head, tail, text, cancel, **popen_kwargs)
+        lines = list(stream)
+    finally:
+        if token is not None:
+            token.close()
+    if check and not stream.truncated and stream.returncode:
+        raise subprocess.CalledProcessError(stream.returncode, args)
+    return StreamResult(args, lines, stream.returncode, stream.truncated)
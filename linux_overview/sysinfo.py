@@ -0,0 +1,268 @@
+"""System snapshot straight from the kernel instead of uname/df/free/lscpu.
+
+The "show system information" cells fork four programs and get four text
+blobs back.  Everything they print is available from ``os.uname()``,
+``/proc/self/mountinfo`` + ``os.statvfs``, ``/proc/meminfo`` and
+``/proc/cpuinfo``, so :func:`snapshot` reads those directly and returns typed
+records::
+
+    from linux_overview.sysinfo import snapshot
+
+    snap = snapshot()
+    snap.memory.available, [d.mountpoint for d in snap.disks]
+
+CPU topology does not change while the system is up, so :func:`cpu_info`
+parses ``/proc/cpuinfo`` once and caches the result; call
+``cpu_info.cache_clear()`` after CPU hotplug.  All sizes are in bytes.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import platform
+import re
+from typing import FrozenSet, List, NamedTuple, Optional
+
+MOUNTINFO = '/proc/self/mountinfo'
+MEMINFO = '/proc/meminfo'
+CPUINFO = '/proc/cpuinfo'
+UPTIME = '/proc/uptime'
+
+# Kernel-synthesized filesystems: no regular files worth scanning, and
+# reading some of them is slow or has side effects.
+PSEUDO_FSTYPES = frozenset([
+    'proc', 'sysfs', 'devtmpfs', 'devpts', 'cgroup', 'cgroup2', 'debugfs',
+    'tracefs', 'securityfs', 'pstore', 'bpf', 'configfs', 'fusectl',
+    'mqueue', 'hugetlbfs', 'binfmt_misc', 'efivarfs', 'selinuxfs',
+    'nsfs', 'rpc_pipefs'])
+# Automount triggers.  /home or /net are often autofs with the real
+# filesystems mounted on or below them, so only idle triggers, where entering
+# would start a mount, count as pseudo (see pseudo_mountpoints()).
+AUTOFS = 'autofs'
+
+_OCTAL_ESCAPE = re.compile(r'\\([0-7]{3})')
+
+# Last raw mountinfo contents and what it parsed to; the mount table rarely
+# changes between polls, so re-parsing is skipped when the bytes match.
+_mounts_cache: tuple = (None, [])
+
+
+class Uname(NamedTuple):
+    sysname: str
+    nodename: str
+    release: str
+    version: str
+    machine: str
+
+
+class Mount(NamedTuple):
+    mount_id: int
+    parent_id: int
+    device: str
+    root: str
+    mountpoint: str
+    options: str
+    fstype: str
+    source: str
+
+
+class DiskUsage(NamedTuple):
+    source: str
+    fstype: str
+    mountpoint: str
+    total: int
+    used: int
+    available: int
+
+    @property
+    def percent(self) -> float:
+        # Same rounding base as df: used / (used + available).
+        base = self.used + self.available
+        return 100.0 * self.used / base if base else 0.0
+
+
+class Memory(NamedTuple):
+    total: int
+    free: int
+    available: int
+    shared: int
+    buffers: int
+    cached: int
+    swap_total: int
+    swap_free: int
+
+    @property
+    def used(self) -> int:
+        # free(1) since procps-ng 4: total - available.
+        return self.total - self.available
+
+
+class CpuInfo(NamedTuple):
+    architecture: str
+    vendor: str
+    model_name: str
+    logical: int
+    cores: int
+    sockets: int
+    mhz: Optional[float]
+    flags: FrozenSet[str]
+
+    @property
+    def threads_per_core(self) -> int:
+        return max(1, self.logical // max(1, self.cores))
+
+
+class Snapshot(NamedTuple):
+    uname: Uname
+    uptime: float
+    loadavg: tuple
+    cpu: CpuInfo
+    memory: Memory
+    disks: List[DiskUsage]
+
+
+def _unescape(field: str) -> str:
+    # mountinfo escapes space, tab, newline and backslash as \ooo.
+    if '\\' not in field:
+        return field
+    return _OCTAL_ESCAPE.sub(lambda m: chr(int(m.group(1), 8)), field)
+
+
+def _read(path: str) -> str:
+    # A single read(2) of the whole pseudo-file; much cheaper than a
+    # buffered text-mode open() for these small /proc files.
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        chunks = []
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    return b''.join(chunks).decode('utf-8', 'surrogateescape')
+
+
+def uname() -> Uname:
+    return Uname(*os.uname())
+
+
+def read_mounts(path: str = MOUNTINFO) -> List[Mount]:
+    """Parse ``/proc/self/mountinfo`` into :class:`Mount` records."""
+    global _mounts_cache
+    raw = _read(path)
+    if path == MOUNTINFO and raw == _mounts_cache[0]:
+        return list(_mounts_cache[1])
+    mounts = []
+    for line in raw.splitlines():
+        left, _, right = line.partition(' - ')
+        fields = left.split()
+        extra = right.split()
+        if len(fields) < 6 or len(extra) < 2:
+            continue
+        mounts.append(Mount(int(fields[0]), int(fields[1]), fields[2],
+                            _unescape(fields[3]), _unescape(fields[4]),
+                            fields[5], extra[0], _unescape(extra[1])))
+    if path == MOUNTINFO:
+        _mounts_cache = (raw, mounts)
+    return list(mounts)
+
+
+def pseudo_mountpoints(path: str = MOUNTINFO) -> FrozenSet[str]:
+    """Mount points of :data:`PSEUDO_FSTYPES` filesystems.
+
+    autofs mount points are included only while nothing else is mounted at
+    or below them, so automounted /home or /net trees stay visible.
+    """
+    mounts = read_mounts(path)
+    points = {m.mountpoint for m in mounts if m.fstype in PSEUDO_FSTYPES}
+    mounted = [m.mountpoint for m in mounts if m.fstype != AUTOFS]
+    for m in mounts:
+        if m.fstype != AUTOFS:
+            continue
+        below = m.mountpoint.rstrip('/') + '/'
+        if not any(p == m.mountpoint or p.startswith(below) for p in mounted):
+            points.add(m.mountpoint)
+    return frozenset(points)
+
+
+def disk_usage(all: bool = False) -> List[DiskUsage]:
+    """``df`` equivalent; like df, filesystems without blocks are skipped
+    unless ``all`` is true."""
+    disks = []
+    for m in read_mounts():
+        try:
+            st = os.statvfs(m.mountpoint)
+        except OSError:
+            continue
+        if not st.f_blocks and not all:
+            continue
+        size = st.f_frsize
+        disks.append(DiskUsage(m.source, m.fstype, m.mountpoint,
+                               st.f_blocks * size,
+                               (st.f_blocks - st.f_bfree) * size,
+                               st.f_bavail * size))
+    return disks
+
+
+def memory(path: str = MEMINFO) -> Memory:
+    """``free`` equivalent built from ``/proc/meminfo``."""
+    text = '\n' + _read(path)
+
+    def field(key: str, default: int = 0) -> int:
+        # Lines are "Key:   value kB"; every key used here is in kB.
+        start = text.find('\n%s:' % key)
+        if start < 0:
+            return default
+        start += len(key) + 2
+        return int(text[start:text.index('k', start)]) * 1024
+
+    free = field('MemFree')
+    return Memory(field('MemTotal'), free, field('MemAvailable', free),
+                  field('Shmem'), field('Buffers'),
+                  field('Cached') + field('SReclaimable'),
+                  field('SwapTotal'), field('SwapFree'))
+
+
+@functools.lru_cache(maxsize=None)
+def cpu_info(path: str = CPUINFO) -> CpuInfo:
+    """``lscpu`` equivalent built from ``/proc/cpuinfo`` (cached)."""
+    blocks = []
+    block: dict = {}
+    with open(path) as f:
+        for line in f:
+            key, sep, value = line.partition(':')
+            if not sep:
+                if block:
+                    blocks.append(block)
+                    block = {}
+                continue
+            key = key.strip()
+            if key in ('processor', 'vendor_id', 'model name', 'cpu MHz',
+                       'flags', 'Features', 'physical id', 'core id'):
+                block[key] = value.strip()
+    if block:
+        blocks.append(block)
+    logical = len(blocks)
+    sockets = {b.get('physical id', '0') for b in blocks}
+    cores = {(b.get('physical id', '0'), b.get('core id', str(i)))
+             for i, b in enumerate(blocks)}
+    first = blocks[0] if blocks else {}
+    mhz = first.get('cpu MHz')
+    flags = first.get('flags', first.get('Features', ''))
+    return CpuInfo(platform.machine(), first.get('vendor_id', ''),
+                   first.get('model name', ''), logical or os.cpu_count() or 1,
+                   len(cores) or 1, len(sockets) or 1,
+                   float(mhz) if mhz else None, frozenset(flags.split()))
+
+
+def uptime(path: str = UPTIME) -> float:
+    return float(_read(path).split()[0])
+
+
+def snapshot() -> Snapshot:
+    """Everything the four forked commands reported, in one call."""
+    return Snapshot(uname(), uptime(), os.getloadavg(), cpu_info(), memory(),
+                    disk_usage())
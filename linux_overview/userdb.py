@@ -0,0 +1,178 @@
+"""In-process ``/etc/passwd`` and ``/etc/group`` database.
+
+"show list of other users" re-reads /etc/passwd with ``readlines()`` and
+``line.split(':')[0]`` on every call, and ``whoami`` / ``id`` are forked
+separately.  :class:`UserDB` parses both files once into dicts indexed by
+name and by id, plus a user -> groups reverse index, and re-parses only when
+a file's mtime, size or inode changes::
+
+    from linux_overview.userdb import UserDB
+
+    db = UserDB()
+    db.current().name                        # whoami
+    db.by_uid(1000).home                     # uid -> home
+    [g.name for g in db.groups_of('sandbox')]  # id -G
+
+Whether the files changed is checked at most once per ``check_interval``
+seconds, so lookups in a tight loop are plain dict accesses.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+PASSWD = '/etc/passwd'
+GROUP = '/etc/group'
+
+
+class User(NamedTuple):
+    name: str
+    uid: int
+    gid: int
+    gecos: str
+    home: str
+    shell: str
+
+
+class Group(NamedTuple):
+    name: str
+    gid: int
+    members: Tuple[str, ...]
+
+
+def _identity(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _records(path: str, min_fields: int) -> List[List[str]]:
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+    records = []
+    for line in lines:
+        if not line or line.startswith('#'):
+            continue
+        fields = line.split(':')
+        if len(fields) >= min_fields:
+            records.append(fields)
+    return records
+
+
+class UserDB:
+    """Users and groups indexed by name and id, reloaded on change."""
+
+    def __init__(self, passwd: str = PASSWD, group: str = GROUP,
+                 check_interval: float = 1.0):
+        self.passwd = passwd
+        self.group = group
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked = float('-inf')
+        self._identity: Tuple[Optional[tuple], Optional[tuple]] = (None, None)
+        self._users: Dict[str, User] = {}
+        self._uids: Dict[int, User] = {}
+        self._groups: Dict[str, Group] = {}
+        self._gids: Dict[int, Group] = {}
+        self._membership: Dict[str, Tuple[Group, ...]] = {}
+
+    def _load(self) -> None:
+        users: Dict[str, User] = {}
+        uids: Dict[int, User] = {}
+        for f in _records(self.passwd, 7):
+            try:
+                user = User(f[0], int(f[2]), int(f[3]), f[4], f[5], f[6])
+            except ValueError:
+                continue
+            users.setdefault(user.name, user)
+            uids.setdefault(user.uid, user)
+        groups: Dict[str, Group] = {}
+        gids: Dict[int, Group] = {}
+        members: Dict[str, List[Group]] = {}
+        for f in _records(self.group, 4):
+            try:
+                group = Group(f[0], int(f[2]),
+                              tuple(m for m in f[3].split(',') if m))
+            except ValueError:
+                continue
+            groups.setdefault(group.name, group)
+            gids.setdefault(group.gid, group)
+            for m in group.members:
+                members.setdefault(m, []).append(group)
+        membership = {}
+        for user in users.values():
+            # Primary group first, like id(1), then supplementary ones.
+            primary = gids.get(user.gid)
+            extra = [g for g in members.get(user.name, ()) if g is not primary]
+            membership[user.name] = tuple(([primary] if primary else []) + extra)
+        for name, extra in members.items():
+            membership.setdefault(name, tuple(extra))
+        self._users, self._uids = users, uids
+        self._groups, self._gids = groups, gids
+        self._membership = membership
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload if either file changed; return whether it reloaded."""
+        now = time.monotonic()
+        if not force and now - self._checked < self.check_interval:
+            return False
+        with self._lock:
+            self._checked = now
+            identity = (_identity(self.passwd), _identity(self.group))
+            if not force and identity == self._identity:
+                return False
+            self._load()
+            self._identity = identity
+            return True
+
+    def users(self) -> List[User]:
+        self.refresh()
+        return list(self._users.values())
+
+    def groups(self) -> List[Group]:
+        self.refresh()
+        return list(self._groups.values())
+
+    def by_name(self, name: str) -> Optional[User]:
+        self.refresh()
+        return self._users.get(name)
+
+    def by_uid(self, uid: int) -> Optional[User]:
+        self.refresh()
+        return self._uids.get(uid)
+
+    def group_by_name(self, name: str) -> Optional[Group]:
+        self.refresh()
+        return self._groups.get(name)
+
+    def group_by_gid(self, gid: int) -> Optional[Group]:
+        self.refresh()
+        return self._gids.get(gid)
+
+    def groups_of(self, name: str) -> Tuple[Group, ...]:
+        """Primary and supplementary groups of a user, primary first."""
+        self.refresh()
+        return self._membership.get(name, ())
+
+    def current(self) -> Optional[User]:
+        """The user this process runs as (``whoami``)."""
+        return self.by_uid(os.geteuid())
+
+
+_default: Optional[UserDB] = None
+
+
+def default_db() -> UserDB:
+    """Shared database over the system files."""
+    global _default
+    if _default is None:
+        _default = UserDB()
+    return _default
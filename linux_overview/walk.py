@@ -0,0 +1,394 @@
+"""Parallel ``os.scandir`` walker replacing ``find / -type f -name ...``.
+
+The find cells in main.py fork ``find``, buffer its whole stdout and then keep
+``splitlines()[:50]``.  :func:`walk_files` walks the tree in-process instead:
+a small thread pool fans out across directory subtrees, include/exclude globs
+are evaluated while walking (excluded directories are never entered) and the
+results come back through a generator that shuts the walk down as soon as the
+caller stops iterating::
+
+    from linux_overview.walk import walk_files
+
+    list(walk_files('/', include='*.py', exclude='*/lib2to3/*', limit=50))
+
+Whole-system scans take a :class:`Traversal` policy instead of a blind
+``-maxdepth``: :data:`SYSTEM_TRAVERSAL` prunes /proc, /sys and /dev, skips
+every pseudo filesystem listed in /proc/self/mountinfo and visits shallow
+directories first, so ``walk_files('/', include='Dockerfile',
+traversal=SYSTEM_TRAVERSAL)`` reports /app/Dockerfile long before anything
+buried under site-packages.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import itertools
+import os
+import queue
+import re
+import threading
+from typing import (Callable, Iterable, Iterator, List, NamedTuple, Optional,
+                    Tuple, Union)
+
+from .cancel import CancelToken
+from .sysinfo import pseudo_mountpoints
+
+Patterns = Union[str, Iterable[str], None]
+
+DEFAULT_WORKERS = 8
+
+_DONE = object()
+
+# How often a cancellable walk re-checks its token while waiting for results.
+_POLL_INTERVAL = 0.05
+
+
+class ScanResult(NamedTuple):
+    paths: List[str]
+    truncated: bool
+
+
+class Traversal(NamedTuple):
+    """Which directories a walk enters, and in what order.
+
+    ``max_depth`` follows ``find -maxdepth`` (files directly in a root are
+    depth 1); ``xdev`` stays on each root's filesystem; ``prune`` lists
+    absolute directory paths never entered; ``skip_pseudo`` also prunes the
+    mount points of pseudo filesystems (proc, sysfs, cgroup, idle autofs
+    triggers, ...);
+    ``breadth_first`` scans all shallower directories before deeper ones.
+    Roots themselves are always scanned.
+    """
+    max_depth: Optional[int] = None
+    xdev: bool = False
+    prune: Tuple[str, ...] = ()
+    skip_pseudo: bool = False
+    breadth_first: bool = False
+
+
+SYSTEM_PRUNE = ('/proc', '/sys', '/dev')
+
+SYSTEM_TRAVERSAL = Traversal(prune=SYSTEM_PRUNE, skip_pseudo=True,
+                             breadth_first=True)
+
+
+def _as_list(value: Patterns) -> list:
+    if value is None:
+        return []
+    if isinstance(value, (str, bytes, os.PathLike)):
+        return [os.fspath(value)]
+    return [os.fspath(v) for v in value]
+
+
+def compile_globs(patterns: Patterns) -> Optional[Callable[[str], bool]]:
+    """Compile shell globs into a single matcher, or ``None`` if empty."""
+    patterns = _as_list(patterns)
+    if not patterns:
+        return None
+    regex = re.compile('|'.join(fnmatch.translate(p) for p in patterns))
+    return lambda s: regex.match(s) is not None
+
+
+class _Walk:
+    """One parallel traversal; yields ``(tag, path)`` for every hit.
+
+    ``match(name)`` decides whether a regular file is a hit and returns the
+    tag to report with it (``None`` means no match).  ``exclude(path)`` is
+    tested against full paths; directories are tested with a trailing
+    slash and pruned when they match.  When ``cancel`` fires the walk stops
+    and :attr:`cancelled` is set.
+
+    Queued directories are ``(depth, seq, path, dev)`` tuples; with
+    ``breadth_first`` they go through a priority queue so the shallowest
+    pending directory is always scanned next.
+    """
+
+    def __init__(self, roots, match, exclude=None, workers=DEFAULT_WORKERS,
+                 follow_symlinks=False, cancel: Optional[CancelToken] = None,
+                 traversal: Optional[Traversal] = None):
+        self.roots = _as_list(roots)
+        self.match = match
+        self.exclude = exclude
+        self.workers = max(1, workers)
+        self.follow_symlinks = follow_symlinks
+        traversal = traversal or Traversal()
+        self.max_depth = traversal.max_depth
+        self.xdev = traversal.xdev
+        prune = {os.path.abspath(p) for p in traversal.prune}
+        if traversal.skip_pseudo:
+            prune.update(pseudo_mountpoints())
+        self.prune = frozenset(prune)
+        self._seq = itertools.count()
+        self._dirs: queue.Queue = (queue.PriorityQueue()
+                                   if traversal.breadth_first else queue.Queue())
+        self._out: queue.Queue = queue.Queue(maxsize=self.workers * 4)
+        self._stop = threading.Event()
+        self._seen: set = set()
+        self._seen_lock = threading.Lock()
+        self.cancel = cancel
+        self.cancelled = False
+
+    def _emit(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _first_visit(self, path: str) -> bool:
+        # Only needed when following symlinks, where loops are possible.
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        key = (st.st_dev, st.st_ino)
+        with self._seen_lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+        return True
+
+    def _descend(self, entry: os.DirEntry, dev: Optional[int]) -> bool:
+        # Prune entries are absolute; entry.path is relative below a
+        # relative root.
+        if os.path.abspath(entry.path) in self.prune:
+            return False
+        if dev is not None:
+            try:
+                return entry.stat(follow_symlinks=self.follow_symlinks).st_dev == dev
+            except OSError:
+                return False
+        return True
+
+    def _scan(self, depth: int, path: str, dev: Optional[int]) -> None:
+        match, exclude, follow = self.match, self.exclude, self.follow_symlinks
+        # Entries of this directory are at depth + 1; their subdirectories
+        # would only contribute files deeper than that.
+        descend = self.max_depth is None or depth + 1 < self.max_depth
+        policy = bool(self.prune) or dev is not None
+        seq = self._seq
+        hits = []
+        try:
+            it = os.scandir(path)
+        except OSError:
+            return
+        with it:
+            try:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=follow):
+                            full = entry.path
+                            if not descend:
+                                continue
+                            if exclude is not None and exclude(full + '/'):
+                                continue
+                            if policy and not self._descend(entry, dev):
+                                continue
+                            if follow and not self._first_visit(full):
+                                continue
+                            self._dirs.put((depth + 1, next(seq), full, dev))
+                            continue
+                        if not entry.is_file(follow_symlinks=follow):
+                            continue
+                    except OSError:
+                        continue
+                    tag = match(entry.name)
+                    if tag is None:
+                        continue
+                    full = entry.path
+                    if exclude is not None and exclude(full):
+                        continue
+                    hits.append((tag, full))
+            except OSError:
+                # Directories can fail mid-listing (/proc entries of exiting
+                # processes); keep what was read so far.
+                pass
+        if hits:
+            self._emit(hits)
+
+    def _worker(self) -> None:
+        dirs = self._dirs
+        while True:
+            depth, _, path, dev = dirs.get()
+            try:
+                if path is None:
+                    return
+                if not self._stop.is_set():
+                    self._scan(depth, path, dev)
+            finally:
+                dirs.task_done()
+
+    def _monitor(self, threads) -> None:
+        self._dirs.join()
+        for _ in threads:
+            self._dirs.put((float('inf'), next(self._seq), None, None))
+        self._emit(_DONE)
+
+    def __iter__(self) -> Iterator[Tuple[object, str]]:
+        for root in self.roots:
+            if self.follow_symlinks and not self._first_visit(root):
+                continue
+            if self.max_depth is not None and self.max_depth < 1:
+                continue
+            dev = None
+            if self.xdev:
+                try:
+                    dev = os.stat(root).st_dev
+                except OSError:
+                    continue
+            self._dirs.put((0, next(self._seq), root, dev))
+        threads = [threading.Thread(target=self._worker, daemon=True)
+                   for _ in range(self.workers)]
+        for t in threads:
+            t.start()
+        threading.Thread(target=self._monitor, args=(threads,),
+                         daemon=True).start()
+        cancel = self.cancel
+        unregister = cancel.on_cancel(self._stop.set) if cancel else None
+        try:
+            while True:
+                if cancel is None:
+                    batch = self._out.get()
+                else:
+                    if cancel.cancelled:
+                        self.cancelled = True
+                        return
+                    try:
+                        batch = self._out.get(timeout=_POLL_INTERVAL)
+                    except queue.Empty:
+                        continue
+                if batch is _DONE:
+                    return
+                yield from batch
+        finally:
+            if unregister is not None:
+                unregister()
+            # Reached on exhaustion, on close() and on garbage collection of
+            # an abandoned generator: the workers drain the queue and exit.
+            self._stop.set()
+
+
+def walk_files(roots: Patterns = '/', include: Patterns = None,
+               exclude: Patterns = None, limit: Optional[int] = None,
+               workers: int = DEFAULT_WORKERS,
+               follow_symlinks: bool = False,
+               cancel: Optional[CancelToken] = None,
+               traversal: Optional[Traversal] = None) -> Iterator[str]:
+    """Yield paths of regular files below ``roots``.
+
+    ``include`` globs are matched against the file name (like ``-name``),
+    ``exclude`` globs against the full path (like ``! -path``); a directory
+    matching an exclude pattern with a trailing ``/`` is not descended into,
+    so ``*/lib2to3/*`` skips the whole lib2to3 tree.  The walk stops once
+    ``limit`` paths have been produced, the generator is closed or
+    ``cancel`` fires.  Order follows the traversal and is not sorted;
+    ``traversal`` bounds and orders it.
+    """
+    if limit is not None and limit <= 0:
+        return
+    gen = iter(_file_walk(roots, include, exclude, workers, follow_symlinks,
+                          cancel, traversal))
+    try:
+        for count, (_, path) in enumerate(gen, 1):
+            yield path
+            if limit is not None and count >= limit:
+                return
+    finally:
+        gen.close()
+
+
+def _file_walk(roots, include, exclude, workers, follow_symlinks,
+               cancel, traversal) -> _Walk:
+    inc = compile_globs(include)
+    match = (lambda name: True) if inc is None else (
+        lambda name: True if inc(name) else None)
+    return _Walk(roots, match, compile_globs(exclude), workers,
+                 follow_symlinks, cancel, traversal)
+
+
+def scan_files(roots: Patterns = '/', include: Patterns = None,
+               exclude: Patterns = None, limit: Optional[int] = None,
+               workers: int = DEFAULT_WORKERS, follow_symlinks: bool = False,
+               cancel: Optional[CancelToken] = None,
+               timeout: Optional[float] = None,
+               traversal: Optional[Traversal] = None) -> ScanResult:
+    """Collect :func:`walk_files` results, keeping them if the scan is cut short.
+
+    ``timeout`` gives the scan its own deadline (combined with ``cancel``
+    if both are given).  ``truncated`` is true when the walk did not run to
+    completion, because of ``limit``, the deadline or cancellation.
+    """
+    paths: List[str] = []
+    if limit is not None and limit <= 0:
+        return ScanResult(paths, True)
+    token = None
+    if timeout is not None:
+        cancel = token = CancelToken(timeout, parent=cancel)
+    walk = _file_walk(roots, include, exclude, workers, follow_symlinks,
+                      cancel, traversal)
+    gen = iter(walk)
+    try:
+        for _, path in gen:
+            paths.append(path)
+            if limit is not None and len(paths) >= limit:
+                return ScanResult(paths, True)
+    finally:
+        gen.close()
+        if token is not None:
+            token.close()
+    return ScanResult(paths, walk.cancelled)
+
+
+def _compile_buckets(patterns) -> Callable[[str], Optional[Tuple[str, ...]]]:
+    # One alternation over all patterns rejects most file names with a single
+    # regex call; only names it accepts are tested against each pattern, so a
+    # name matching several patterns is routed to all of them.
+    translated = [fnmatch.translate(p) for p in patterns]
+    prefilter = re.compile('|'.join(translated))
+    singles = [(p, re.compile(t).match) for p, t in zip(patterns, translated)]
+
+    def match(name: str) -> Optional[Tuple[str, ...]]:
+        if prefilter.match(name) is None:
+            return None
+        return tuple(p for p, m in singles if m(name) is not None)
+    return match
+
+
+def iter_matches(roots: Patterns, patterns: Iterable[str],
+                 exclude: Patterns = None, workers: int = DEFAULT_WORKERS,
+                 follow_symlinks: bool = False,
+                 traversal: Optional[Traversal] = None) -> Iterator[Tuple[str, str]]:
+    """Yield ``(pattern, path)`` for files matching any of ``patterns``.
+
+    All patterns are checked during a single traversal.  A file name that
+    matches several patterns is reported once per matching pattern.
+    """
+    patterns = list(dict.fromkeys(_as_list(patterns)))
+    if not patterns:
+        return iter(())
+    walk = _Walk(roots, _compile_buckets(patterns), compile_globs(exclude),
+                 workers, follow_symlinks, traversal=traversal)
+    return ((pattern, path) for matched, path in walk for pattern in matched)
+
+
+def find_many(roots: Patterns, patterns: Iterable[str],
+              exclude: Patterns = None, workers: int = DEFAULT_WORKERS,
+              follow_symlinks: bool = False,
+              traversal: Optional[Traversal] = None) -> dict:
+    """Find files for several name globs in one walk.
+
+    Returns a dict mapping every pattern to the list of matching paths (a
+    path matching several patterns appears under each), so the
+    requirements.txt / Dockerfile cell becomes::
+
+        hits = find_many('/', ['requirements.txt', 'Dockerfile'])
+        hits['requirements.txt'], hits['Dockerfile']
+    """
+    patterns = list(dict.fromkeys(_as_list(patterns)))
+    buckets = {p: [] for p in patterns}
+    for pattern, path in iter_matches(roots, patterns, exclude, workers,
+                                      follow_symlinks, traversal):
+        buckets[pattern].append(path)
+    return buckets
@@ -0,0 +1,18 @@
+from linux_overview.aiorun import run_many
+
+
+def test_results_in_order_with_errors():
+    ok, failed, missing = run_many([['echo', 'ok'],
+                                    ['sh', '-c', 'echo e >&2; exit 3'],
+                                    ['no-such-command-here']])
+    assert (ok.ok, ok.stdout) == (True, 'ok\n')
+    assert (failed.returncode, failed.stderr) == (3, 'e\n')
+    assert missing.returncode is None and missing.error
+
+
+def test_timeout_keeps_partial_output():
+    (result,) = run_many([['sh', '-c', 'echo hi; sleep 5 & sleep 5']],
+                         timeout=0.3)
+    assert result.timed_out and not result.ok
+    assert result.stdout == 'hi\n'
+    assert result.elapsed < 2
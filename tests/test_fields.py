@@ -0,0 +1,29 @@
+import pytest
+
+from linux_overview.fields import awk_print, column_batches, columns, split_fields
+
+
+@pytest.mark.parametrize('line, expected', [
+    ('a b\r', ['a', 'b\r']),
+    ('a\vb c', ['a\vb', 'c']),
+    ('  a \t b  ', ['a', 'b']),
+    ('x y z', ['x y', 'z']),
+    ('   ', []),
+])
+def test_default_separator_matches_columns(line, expected):
+    assert split_fields(line) == expected
+    padded = expected + [''] * (3 - len(expected))
+    assert list(columns([line], (1, 2, 3))) == [tuple(padded)]
+
+
+def test_single_character_and_regex_separators():
+    assert split_fields('09-08-2023', '-') == ['09', '08', '2023']
+    assert awk_print(['09-08-2023', '1-2'], (3, 1), sep='-') == ['2023 09', ' 1']
+    assert split_fields('a::b:c', '::') == ['a', 'b:c']
+    assert list(columns('a1b\nc22d\n', (0, 2), sep='[0-9]+')) == \
+        [('a1b', 'b'), ('c22d', 'd')]
+
+
+def test_column_batches_with_pattern():
+    (batch,) = column_batches('x 1\ny 2\nx 3\n', (2,), pattern='^x')
+    assert batch == [['1', '3']]
@@ -0,0 +1,43 @@
+import pytest
+
+from linux_overview.grep import grep
+
+
+@pytest.fixture
+def blank_lines(tmp_path):
+    path = tmp_path / 'blank.txt'
+    path.write_bytes(b'a\n\n\nb\n')
+    return str(path)
+
+
+def _hits(path, pattern):
+    return [(m.line_no, m.line) for m in grep([path], pattern, workers=1)]
+
+
+def test_match_does_not_span_lines(blank_lines):
+    assert _hits(blank_lines, rb'\s+') == []
+
+
+def test_class_does_not_match_newline(blank_lines):
+    assert _hits(blank_lines, rb'[^a]') == [(4, b'b')]
+
+
+def test_no_line_after_final_newline(blank_lines):
+    assert _hits(blank_lines, rb'^$') == [(2, b''), (3, b'')]
+
+
+def test_last_line_without_newline(tmp_path):
+    path = tmp_path / 'tail.txt'
+    path.write_bytes(b'x\nyz')
+    assert _hits(str(path), rb'z$') == [(2, b'yz')]
+    assert _hits(str(path), rb'$') == [(1, b'x'), (2, b'yz')]
+
+
+def test_text_and_binary(tmp_path):
+    text = tmp_path / 'a.txt'
+    text.write_bytes(b'one\r\ntwo secret\r\n')
+    binary = tmp_path / 'b.bin'
+    binary.write_bytes(b'\0secret\n')
+    found = list(grep([str(text), str(binary)], 'secret', workers=1, text=True))
+    assert [(m.path, m.line_no, m.line) for m in found] == \
+        [(str(text), 2, 'two secret')]
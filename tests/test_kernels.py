@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+import socket
+
+import pytest
+
+from linux_overview.kernels import (PORT_NAMES, KernelDirectory,
+                                    check_liveness, check_liveness_async,
+                                    load_connection)
+
+
+@pytest.fixture
+def listeners():
+    socks = []
+    for _ in PORT_NAMES:
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        sock.listen(4)
+        socks.append(sock)
+    yield [s.getsockname()[1] for s in socks]
+    for sock in socks:
+        sock.close()
+
+
+def _free_ports(n):
+    socks = [socket.socket() for _ in range(n)]
+    for sock in socks:
+        sock.bind(('127.0.0.1', 0))
+    ports = [s.getsockname()[1] for s in socks]
+    for sock in socks:
+        sock.close()
+    return ports
+
+
+def _write(directory, name, ports, **extra):
+    info = dict(zip(PORT_NAMES, ports), ip='127.0.0.1', key='k',
+                kernel_name='python3', **extra)
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+        json.dump(info, f)
+    return path
+
+
+@pytest.fixture
+def kernels(tmp_path, listeners):
+    alive = load_connection(_write(tmp_path, 'kernel-alive.json', listeners))
+    dead = load_connection(_write(tmp_path, 'kernel-dead.json', _free_ports(5)))
+    partial = load_connection(_write(tmp_path, 'kernel-partial.json',
+                                     listeners[:2] + _free_ports(3)))
+    return alive, dead, partial
+
+
+def test_check_liveness(kernels):
+    alive, dead, partial = check_liveness(kernels, timeout=1.0)
+    assert alive.state == 'alive' and alive.up == PORT_NAMES
+    assert dead.state == 'dead' and dead.down == PORT_NAMES
+    assert dead.probed == 5
+    assert partial.state == 'partial'
+    assert partial.up == PORT_NAMES[:2]
+
+
+def test_check_liveness_inside_running_loop(kernels):
+    async def cell():
+        # What a notebook cell does: the sync call must not need the loop.
+        return check_liveness(kernels), await check_liveness_async(kernels)
+
+    sync, native = asyncio.run(cell())
+    assert [s.state for s in sync] == [s.state for s in native] == \
+        ['alive', 'dead', 'partial']
+
+
+def test_ipc_transport_is_down(tmp_path, listeners):
+    conn = load_connection(_write(tmp_path, 'kernel-ipc.json', listeners,
+                                  transport='ipc'))
+    (status,) = check_liveness([conn])
+    assert status.state == 'dead' and status.probed == 0
+
+
+def test_poll_keeps_broken_files(tmp_path, listeners):
+    directory = KernelDirectory(str(tmp_path))
+    good = _write(tmp_path, 'kernel-good.json', listeners)
+    broken = os.path.join(tmp_path, 'kernel-broken.json')
+    with open(broken, 'w') as f:
+        f.write('{')
+    added, removed = directory.poll()
+    assert [c.path for c in added] == [good] and removed == []
+    assert broken in directory.errors
+
+    os.unlink(good)
+    assert directory.poll() == ([], [good])
+    os.unlink(broken)
+    assert directory.poll() == ([], [broken])
+    assert directory.errors == {}
+
+
+def test_poll_rescans_while_mtime_is_recent(tmp_path, listeners, monkeypatch):
+    directory = KernelDirectory(str(tmp_path))
+    directory.scan()
+    # A file created within the same timestamp tick as the scan.
+    mtime = os.stat(tmp_path).st_mtime_ns
+    path = _write(tmp_path, 'kernel-late.json', listeners)
+    os.utime(tmp_path, ns=(mtime, mtime))
+    added, _ = directory.poll()
+    assert [c.path for c in added] == [path]
+
+    # Once the directory is old enough, an unchanged mtime skips the scan.
+    old = mtime - 10 * 10**9
+    os.utime(tmp_path, ns=(old, old))
+    directory.scan()
+    monkeypatch.setattr(directory, 'scan', lambda: pytest.fail('rescanned'))
+    assert directory.poll() == ([], [])
@@ -0,0 +1,71 @@
+import asyncio
+import socket
+
+import pytest
+
+from linux_overview.probe import (BUCKET_BOUNDS, LatencyHistogram, parse_target,
+                                  probe_many, run_probes, summary)
+
+
+@pytest.fixture
+def listener():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(16)
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+@pytest.fixture
+def closed_port():
+    # A port that was just bound and released: connecting is refused.
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def test_reachable_and_unreachable(listener, closed_port):
+    up, down = run_probes([('127.0.0.1', listener), '127.0.0.1:%d' % closed_port],
+                          count=3, timeout=1.0)
+    assert (up.port, up.sent, up.received, up.errors) == (listener, 3, 3, ())
+    assert up.reachable
+    assert (down.port, down.sent, down.received) == (closed_port, 3, 0)
+    assert not down.reachable
+    assert len(down.errors) == 3
+
+
+def test_histogram_counts(listener, closed_port):
+    reports = asyncio.run(probe_many([('127.0.0.1', listener),
+                                      ('127.0.0.1', closed_port)],
+                                     count=4, limit=2))
+    up, down = reports
+    assert up.histogram.total == sum(up.histogram.counts) == 4
+    assert len(up.histogram.buckets()) == len(BUCKET_BOUNDS) + 1
+    assert 0 < up.histogram.percentile(50) <= up.histogram.max
+    assert down.histogram.total == 0
+    assert down.histogram.percentile(50) is None
+    assert summary(reports).total == 4
+
+
+def test_histogram_merge_and_percentile():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    for seconds in (0.00005, 0.0003, 0.0003):
+        a.record(seconds)
+    b.record(3.0)
+    a.merge(b)
+    assert a.total == 4
+    assert a.counts[0] == 1 and a.counts[2] == 2
+    assert a.percentile(50) == 0.0005
+    assert a.percentile(100) == 3.0
+    assert (a.min, a.max) == (0.00005, 3.0)
+
+
+def test_parse_target():
+    assert parse_target('example.com:443') == ('example.com', 443)
+    assert parse_target('[::1]:22') == ('::1', 22)
+    assert parse_target('::1', default_port=80) == ('::1', 80)
+    assert parse_target(('10.0.0.1', '22')) == ('10.0.0.1', 22)
+    with pytest.raises(ValueError):
+        parse_target('example.com')
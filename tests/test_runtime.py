@@ -0,0 +1,104 @@
+from linux_overview.runtime import _classify, _load, _store
+
+LAYER = 'a' * 64
+CONTAINER = 'c0ffee' * 10 + 'c0ff'
+
+HOST_SCHED = 'systemd (1, #threads: 1)\n'
+
+# A Docker host that is also a Kubernetes node: container overlays, netns
+# and kubelet volumes are all mounted, but / is a plain disk.
+HOST_MOUNTINFO = '\n'.join([
+    '25 1 259:1 / / rw,relatime shared:1 - ext4 /dev/nvme0n1p1 rw',
+    '36 25 0:32 / /var/lib/docker/overlay2/%s/merged rw,relatime - overlay '
+    'overlay rw,lowerdir=/var/lib/docker/overlay2/l/X,upperdir=/var/lib/'
+    'docker/overlay2/%s/diff,workdir=/var/lib/docker/overlay2/%s/work'
+    % (LAYER, LAYER, LAYER),
+    '37 30 0:4 net:[4026532512] /run/docker/netns/0123abcd rw shared:9 - '
+    'nsfs nsfs rw',
+    '38 25 0:40 / /run/containerd/io.containerd.runtime.v2.task/k8s.io/%s/'
+    'rootfs rw,relatime - overlay overlay rw,lowerdir=/var/lib/containerd/'
+    'io.containerd.snapshotter.v1.overlayfs/snapshots/1/fs' % CONTAINER,
+    '39 25 0:41 / /var/lib/kubelet/pods/0f1e/volumes/kubernetes.io~projected/'
+    'kube-api-access-x rw,relatime - tmpfs tmpfs rw,size=65536k',
+])
+
+DOCKER_MOUNTINFO = '\n'.join([
+    '600 540 0:52 / / rw,relatime master:250 - overlay overlay rw,lowerdir='
+    '/var/lib/docker/overlay2/l/X,upperdir=/var/lib/docker/overlay2/%s/diff'
+    % LAYER,
+    '601 600 0:55 / /proc rw,nosuid,nodev,noexec,relatime - proc proc rw',
+])
+
+POD_MOUNTINFO = '\n'.join([
+    '700 650 0:60 / / rw,relatime - overlay overlay rw,lowerdir=/var/lib/'
+    'containerd/io.containerd.snapshotter.v1.overlayfs/snapshots/9/fs',
+    '710 700 259:1 /var/lib/kubelet/pods/0f1e/volumes/kubernetes.io~projected/'
+    'kube-api-access-x /run/secrets/kubernetes.io/serviceaccount ro,relatime '
+    '- tmpfs tmpfs rw',
+])
+
+
+def classify(cgroup='0::/init.scope\n', mountinfo=HOST_MOUNTINFO,
+             sched=HOST_SCHED, environ=None, files=()):
+    return _classify(cgroup, mountinfo, sched, 'Linux version 6.1.0',
+                     environ or {}, lambda path: path in files)
+
+
+def test_docker_and_kubernetes_host_is_bare_metal():
+    rt = classify()
+    assert (rt.kind, rt.kubernetes, rt.container_id) == ('bare-metal', False, None)
+    assert rt.evidence == ()
+    assert not rt.containerized
+
+
+def test_docker_container_from_root_mount():
+    rt = classify(cgroup='0::/\n', mountinfo=DOCKER_MOUNTINFO)
+    assert rt.kind == 'docker' and not rt.kubernetes
+    assert 'mountinfo:docker' in rt.evidence
+    # The overlay is named after a layer, not the container.
+    assert rt.container_id is None
+
+
+def test_docker_container_id_from_hostname_mount():
+    mountinfo = DOCKER_MOUNTINFO + (
+        '\n610 600 259:1 /var/lib/docker/containers/%s/hostname /etc/hostname '
+        'rw,relatime - ext4 /dev/nvme0n1p1 rw' % CONTAINER)
+    rt = classify(cgroup='0::/\n', mountinfo=mountinfo)
+    assert rt.kind == 'docker'
+    assert rt.container_id == CONTAINER
+
+
+def test_docker_container_id_from_cgroup_v1():
+    rt = classify(cgroup='12:pids:/docker/%s\n' % CONTAINER,
+                  mountinfo=DOCKER_MOUNTINFO)
+    assert rt.kind == 'docker'
+    assert rt.container_id == CONTAINER
+
+
+def test_kubernetes_pod():
+    rt = classify(cgroup='0::/\n', mountinfo=POD_MOUNTINFO)
+    assert rt.kind == 'containerd' and rt.kubernetes
+    assert 'mountinfo:/run/secrets/kubernetes.io/serviceaccount' in rt.evidence
+
+
+def test_kubepods_cgroup_and_sched_pid():
+    rt = classify(cgroup='0::/kubepods/besteffort/pod0f1e/%s\n' % CONTAINER,
+                  mountinfo='', sched='bash (4242, #threads: 1)\n')
+    assert rt.kind == 'container' and rt.kubernetes
+    assert rt.container_id == CONTAINER
+
+
+def test_marker_files_and_environment():
+    assert classify(files={'/.dockerenv'}).kind == 'docker'
+    assert classify(environ={'container': 'podman'}).kind == 'podman'
+    assert classify(environ={'container': 'systemd-nspawn'}).kind == 'container'
+
+
+def test_disk_cache_round_trip(tmp_path):
+    path = str(tmp_path / 'runtime.json')
+    rt = classify(cgroup='0::/\n', mountinfo=POD_MOUNTINFO)
+    _store(path, 'boot:mnt:[1]', rt)
+    _store(path, 'boot:mnt:[2]', classify())
+    assert _load(path, 'boot:mnt:[1]') == rt
+    _store(path, 'other-boot:mnt:[1]', rt)
+    assert _load(path, 'boot:mnt:[2]') is None
@@ -0,0 +1,19 @@
+from linux_overview.sysinfo import pseudo_mountpoints
+
+MOUNTINFO = """\
+22 1 8:1 / / rw,relatime - ext4 /dev/sda1 rw
+23 22 0:21 / /proc rw,nosuid - proc proc rw
+30 22 0:40 / /home rw,relatime - autofs systemd-1 rw,fd=5
+31 30 0:41 / /home/alice rw,relatime - nfs4 server:/alice rw
+32 22 0:42 / /net rw,relatime - autofs -hosts rw,fd=7
+33 22 0:43 / /srv/data rw,relatime - autofs systemd-1 rw,fd=9
+34 33 8:2 / /srv/data rw,relatime - xfs /dev/sdb1 rw
+"""
+
+
+def test_pseudo_mountpoints_keeps_active_autofs(tmp_path):
+    path = tmp_path / 'mountinfo'
+    path.write_text(MOUNTINFO)
+    # /home has an NFS mount below it and /srv/data one stacked on it;
+    # only the idle /net trigger is pruned.
+    assert pseudo_mountpoints(str(path)) == {'/proc', '/net'}